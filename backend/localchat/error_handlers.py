@@ -1,15 +1,35 @@
 import logging
-import traceback
 from typing import Dict, Any, Optional, Callable
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
 import httpx
+import orjson
+
+from .exceptions import DatabaseOperationError
 
 # Get logger
 logger = logging.getLogger("localchat")
 
+# Pre-encoded bodies for the fixed part of the most common error responses
+_VALIDATION_ERROR_PREFIX = (
+    b'{"error":true,"code":"VALIDATION_ERROR",'
+    b'"message":"Request validation failed","details":'
+)
+_INTERNAL_ERROR_PREFIX = (
+    b'{"error":true,"code":"INTERNAL_SERVER_ERROR",'
+    b'"message":"An unexpected error occurred","request_id":'
+)
+
+def internal_error_response(request_id: Optional[str]) -> Response:
+    """Build the generic 500 response body from the pre-encoded template"""
+    return Response(
+        content=_INTERNAL_ERROR_PREFIX + orjson.dumps(request_id) + b"}",
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        media_type="application/json"
+    )
+
 class DetailedHTTPException(Exception):
     """Base class for HTTP exceptions with detailed error information"""
     
@@ -23,16 +43,17 @@ class DetailedHTTPException(Exception):
         self.status_code = status_code
         self.detail = detail
         self.error_code = error_code or f"HTTP_{status_code}"
-        self.error_details = error_details or {}
-        
-        # Log the error
-        log_data = {
-            "status_code": status_code,
-            "error_code": self.error_code,
-            "detail": detail,
-            **self.error_details
-        }
-        logger.error(f"HTTP Exception: {detail}", extra={"error_data": log_data})
+        self._error_details = error_details
+    
+    @property
+    def error_details(self) -> Dict[str, Any]:
+        """Error details, built on first access"""
+        if self._error_details is None:
+            self._error_details = self._build_error_details()
+        return self._error_details
+    
+    def _build_error_details(self) -> Dict[str, Any]:
+        return {}
 
 class ModelAPIException(DetailedHTTPException):
     """Exception raised when there's an error communicating with the model API"""
@@ -44,7 +65,18 @@ class ModelAPIException(DetailedHTTPException):
         original_exception: Optional[Exception] = None,
         response_data: Optional[Dict[str, Any]] = None
     ):
+        self.original_exception = original_exception
+        self.response_data = response_data
+        
+        super().__init__(
+            status_code=status_code,
+            detail=detail,
+            error_code="MODEL_API_ERROR"
+        )
+    
+    def _build_error_details(self) -> Dict[str, Any]:
         error_details = {"source": "model_api"}
+        original_exception = self.original_exception
         
         if original_exception:
             error_details["exception_type"] = type(original_exception).__name__
@@ -57,15 +89,20 @@ class ModelAPIException(DetailedHTTPException):
                 except:
                     error_details["remote_response"] = original_exception.response.text[:500]
             
-        if response_data:
-            error_details["response_data"] = response_data
+        if self.response_data:
+            error_details["response_data"] = self.response_data
             
-        super().__init__(
-            status_code=status_code,
-            detail=detail,
-            error_code="MODEL_API_ERROR",
-            error_details=error_details
-        )
+        return error_details
+
+class ModelBusyException(ModelAPIException):
+    """Exception raised when no model generation slot frees up in time"""
+    
+    def __init__(self, detail: str = "The model is busy with other requests; try again shortly"):
+        super().__init__(detail=detail, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.error_code = "MODEL_BUSY"
+    
+    def _build_error_details(self) -> Dict[str, Any]:
+        return {"source": "model_api"}
 
 class DatabaseException(DetailedHTTPException):
     """Exception raised when there's a database error"""
@@ -76,83 +113,115 @@ class DatabaseException(DetailedHTTPException):
         status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR,
         original_exception: Optional[Exception] = None
     ):
-        error_details = {"source": "database"}
+        self.original_exception = original_exception
         
-        if original_exception:
-            error_details["exception_type"] = type(original_exception).__name__
-            
         super().__init__(
             status_code=status_code,
             detail=detail,
-            error_code="DATABASE_ERROR",
-            error_details=error_details
+            error_code="DATABASE_ERROR"
         )
+    
+    def _build_error_details(self) -> Dict[str, Any]:
+        error_details = {"source": "database"}
+        
+        if self.original_exception:
+            error_details["exception_type"] = type(self.original_exception).__name__
+            
+        return error_details
 
 # Exception handlers for FastAPI
-async def http_exception_handler(request: Request, exc: DetailedHTTPException) -> JSONResponse:
-    """Handler for custom HTTP exceptions"""
-    return JSONResponse(
+def _detailed_error_response(exc: DetailedHTTPException, exc_info: Optional[BaseException] = None) -> ORJSONResponse:
+    """Log a DetailedHTTPException once and build its response"""
+    error_details = exc.error_details
+    logger.error(
+        "HTTP Exception: %s",
+        exc.detail,
+        exc_info=exc_info,
+        extra={
+            "error_data": {
+                "status_code": exc.status_code,
+                "error_code": exc.error_code,
+                "detail": exc.detail,
+                **error_details
+            }
+        }
+    )
+    
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": True,
             "code": exc.error_code,
             "message": exc.detail,
-            "details": exc.error_details
+            "details": error_details
         }
     )
 
-async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+async def http_exception_handler(request: Request, exc: DetailedHTTPException) -> ORJSONResponse:
+    """Handler for custom HTTP exceptions"""
+    return _detailed_error_response(exc)
+
+async def database_error_handler(request: Request, exc: DatabaseOperationError) -> ORJSONResponse:
+    """Handler for database errors raised by the service layer"""
+    return _detailed_error_response(
+        DatabaseException(detail=exc.detail, original_exception=exc.original_exception),
+        exc_info=exc
+    )
+
+async def validation_exception_handler(request: Request, exc: RequestValidationError) -> Response:
     """Handler for request validation errors"""
-    # Extract and format validation errors
-    error_details = []
-    for error in exc.errors():
-        error_details.append({
-            "loc": error["loc"],
-            "msg": error["msg"],
-            "type": error["type"]
-        })
+    if isinstance(exc, ValidationError):
+        # pydantic-core can build the trimmed entries itself
+        error_details = exc.errors(
+            include_url=False, include_context=False, include_input=False
+        )
+    else:
+        # Keep only the JSON-safe fields; "ctx" may carry exception objects
+        error_details = [
+            {"loc": error["loc"], "msg": error["msg"], "type": error["type"]}
+            for error in exc.errors()
+        ]
+    error_count = len(error_details)
     
     # Log the validation error
     logger.warning(
-        f"Validation error: {len(error_details)} validation errors", 
+        "Validation error: %d validation errors",
+        error_count,
         extra={"validation_errors": error_details}
     )
     
-    return JSONResponse(
+    return Response(
+        content=_VALIDATION_ERROR_PREFIX + orjson.dumps(error_details) + b"}",
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content={
-            "error": True,
-            "code": "VALIDATION_ERROR",
-            "message": "Request validation failed",
-            "details": error_details
-        }
+        media_type="application/json"
     )
 
-async def generic_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def generic_exception_handler(request: Request, exc: Exception) -> Response:
     """Handler for uncaught exceptions"""
-    # Get traceback information
-    tb_str = traceback.format_exception(type(exc), exc, exc.__traceback__)
+    if logger.isEnabledFor(logging.ERROR):
+        import traceback
+        
+        # Get traceback information
+        tb_str = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+        
+        # Log the error with traceback
+        logger.error(
+            "Uncaught exception: %s",
+            exc,
+            extra={"traceback": tb_str, "path": str(request.url)}
+        )
     
-    # Log the error with traceback
-    logger.error(
-        f"Uncaught exception: {str(exc)}", 
-        extra={"traceback": tb_str, "path": str(request.url)}
-    )
+    # Only the formatted text goes on the record, so queued log records hold
+    # no frames; the exception itself is left intact because the server's
+    # error middleware re-raises it and logs it with its traceback
     
     # Return a generic error message to the client
-    return JSONResponse(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content={
-            "error": True,
-            "code": "INTERNAL_SERVER_ERROR",
-            "message": "An unexpected error occurred",
-            "request_id": request.state.request_id if hasattr(request.state, "request_id") else None
-        }
-    )
+    return internal_error_response(getattr(request.state, "request_id", None))
 
 def register_exception_handlers(app) -> None:
     """Register all exception handlers with the FastAPI app"""
     app.add_exception_handler(DetailedHTTPException, http_exception_handler)
+    app.add_exception_handler(DatabaseOperationError, database_error_handler)
     app.add_exception_handler(RequestValidationError, validation_exception_handler)
     app.add_exception_handler(ValidationError, validation_exception_handler)
     app.add_exception_handler(Exception, generic_exception_handler)
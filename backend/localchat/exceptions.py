@@ -2,12 +2,20 @@ from typing import Any, Optional
 
 class LocalChatException(Exception):
     """Base exception for LocalChat application errors."""
+    # HTTP status to respond with, depending on is_client_error
+    client_status_code = 400
+    server_status_code = 500
+
     def __init__(self, detail: str, original_exception: Optional[Exception] = None, is_client_error: bool = False):
         self.detail = detail
         self.original_exception = original_exception
         self.is_client_error = is_client_error # Flag to suggest 4xx vs 5xx status
         super().__init__(detail)
 
+    @property
+    def status_code(self) -> int:
+        return self.client_status_code if self.is_client_error else self.server_status_code
+
     def __str__(self) -> str:
         if self.original_exception:
             return f"{self.detail} (Original exception: {self.original_exception})"
@@ -25,6 +33,8 @@ class ProfileException(LocalChatException):
 
 class ProfileNotFoundError(ProfileException):
     """Raised when a specific profile cannot be found."""
+    client_status_code = 404
+
     def __init__(self, detail: str = "Profile not found", original_exception: Optional[Exception] = None):
         super().__init__(detail, original_exception, is_client_error=True) # Not found is client-addressable
 
@@ -47,6 +57,8 @@ class ChatException(LocalChatException):
 
 class ChatNotFoundError(ChatException):
     """Raised when a specific chat cannot be found."""
+    client_status_code = 404
+
     def __init__(self, detail: str = "Chat not found", original_exception: Optional[Exception] = None):
         super().__init__(detail, original_exception, is_client_error=True)
 
@@ -83,7 +95,7 @@ class MessageUpdateError(MessageException):
 # --- Model/Provider Related Exceptions ---
 class ModelInteractionError(LocalChatException):
     """Raised during issues communicating with the AI model provider."""
-    pass
+    server_status_code = 502 # The upstream provider failed, not this server
 
 class ProviderConfigurationError(LocalChatException):
     """Raised when provider configuration (URL, API key) is invalid or missing."""
@@ -91,5 +103,7 @@ class ProviderConfigurationError(LocalChatException):
 
 class ModelNotFoundError(ModelInteractionError):
     """Raised when the specified model is not available at the provider."""
+    client_status_code = 404
+
     def __init__(self, detail: str = "Model not found at provider", original_exception: Optional[Exception] = None):
         super().__init__(detail, original_exception, is_client_error=True)
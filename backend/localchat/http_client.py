@@ -0,0 +1,40 @@
+from importlib.util import find_spec
+from typing import Optional
+
+import httpx
+
+# Shared clients so outbound calls reuse pooled keep-alive connections instead
+# of opening a new one per request. They are built on first use, closed on
+# application shutdown (see main.py) and rebuilt if the app starts again.
+_http_client: Optional[httpx.AsyncClient] = None
+_model_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Dependency provider for the shared HTTP client"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+    return _http_client
+
+def get_model_http_client() -> httpx.AsyncClient:
+    """Dependency provider for the shared model API client"""
+    global _model_http_client
+    if _model_http_client is None or _model_http_client.is_closed:
+        # Separate from the client above, as generation calls run far longer
+        # than quick metadata requests. HTTP/2 multiplexes requests to TLS
+        # model APIs over one connection; it needs the h2 package (httpx[http2]).
+        _model_http_client = httpx.AsyncClient(
+            http2=find_spec("h2") is not None,
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50)
+        )
+    return _model_http_client
+
+async def close_http_clients() -> None:
+    """Close the shared clients; the getters build new ones when next called"""
+    for client in (_http_client, _model_http_client):
+        if client is not None:
+            await client.aclose()
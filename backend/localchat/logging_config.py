@@ -1,20 +1,32 @@
+import atexit
+import copy
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Dict, Any
-import json
 from datetime import datetime
-from pathlib import Path
 
-# Create logs directory if it doesn't exist
-logs_dir = Path("logs")
-logs_dir.mkdir(exist_ok=True)
+import orjson
+
+from .request_context import request_id_var
 
 # Configure logging format
 class CustomFormatter(logging.Formatter):
     """Custom formatter that includes timestamp, level, and message"""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._fromtimestamp = datetime.fromtimestamp
+    
     def format(self, record: logging.LogRecord) -> str:
-        timestamp = datetime.fromtimestamp(record.created).isoformat()
+        # The same record is handed to both file handlers; reuse the line
+        # rendered for the first one
+        cached = record.__dict__.get("_json_line")
+        if cached is not None:
+            return cached
+        
+        timestamp = self._fromtimestamp(record.created).isoformat()
         
         log_data: Dict[str, Any] = {
             "timestamp": timestamp,
@@ -22,18 +34,69 @@ class CustomFormatter(logging.Formatter):
             "message": record.getMessage(),
         }
         
-        # Add exception info if available
-        if record.exc_info:
-            log_data["exception"] = self.formatException(record.exc_info)
+        # Add exception info if available (already rendered to exc_text
+        # when the record came through the logging queue)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log_data["exception"] = record.exc_text
+            
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            log_data["request_id"] = request_id
             
         # Add extra fields if available
         if hasattr(record, "extra"):
             log_data["extra"] = record.extra
             
-        return json.dumps(log_data)
+        line = orjson.dumps(log_data, default=str).decode()
+        record._json_line = line
+        return line
+
+# Shared by the file handlers so a record is only rendered once
+_json_formatter = CustomFormatter()
+_exception_formatter = logging.Formatter()
+
+# Rotate file logs instead of appending to them forever
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 5
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the current request ID unless the caller passed one"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+class LocalQueueHandler(QueueHandler):
+    """Queue handler that keeps traceback text in exc_text instead of the message"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class RequestLoggerAdapter(logging.LoggerAdapter):
+    """Logger adapter that merges request-scoped context into per-call extra"""
+
+    def process(self, msg, kwargs):
+        extra = kwargs.get("extra")
+        kwargs["extra"] = {**self.extra, **extra} if extra else self.extra
+        return msg, kwargs
 
 def setup_logging() -> None:
     """Configure application logging"""
+    from pathlib import Path
+    
+    # Create logs directory if it doesn't exist
+    logs_dir = Path("logs")
+    logs_dir.mkdir(exist_ok=True)
     
     # Create logger
     logger = logging.getLogger("localchat")
@@ -46,19 +109,43 @@ def setup_logging() -> None:
     console_handler.setFormatter(console_format)
     
     # Create file handler for all logs
-    file_handler = logging.FileHandler(logs_dir / "localchat.log")
+    file_handler = RotatingFileHandler(
+        logs_dir / "localchat.log",
+        maxBytes=LOG_FILE_MAX_BYTES,
+        backupCount=LOG_FILE_BACKUP_COUNT
+    )
     file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(CustomFormatter())
+    file_handler.setFormatter(_json_formatter)
     
     # Create file handler for errors only
-    error_handler = logging.FileHandler(logs_dir / "error.log")
+    error_handler = RotatingFileHandler(
+        logs_dir / "error.log",
+        maxBytes=LOG_FILE_MAX_BYTES,
+        backupCount=LOG_FILE_BACKUP_COUNT
+    )
     error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(CustomFormatter())
+    error_handler.setFormatter(_json_formatter)
+    
+    # Hand records to a background listener so the console and file writes
+    # happen off the request (event loop) thread. SimpleQueue is unbounded and
+    # skips Queue's task tracking, which the listener doesn't need.
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(
+        log_queue,
+        console_handler,
+        file_handler,
+        error_handler,
+        respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
     
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    logger.addHandler(error_handler)
+    # Filters on the queue handler run in the caller's thread before the
+    # record is enqueued, so the request's context variables are still
+    # visible; the listener thread could not see them
+    queue_handler = LocalQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+    logger.addHandler(queue_handler)
     
     # Set propagate to False to avoid duplicate logs
     logger.propagate = False
@@ -1,13 +1,21 @@
+import asyncio
+import logging
+import os
+import secrets
+import sys
 import time
-import uuid
-from fastapi import FastAPI, Request, status
+from anyio import to_thread
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import uvicorn
+from fastapi.responses import ORJSONResponse
 
 from .routes import router
-from .error_handlers import register_exception_handlers
-from .logging_config import setup_logging
+from .error_handlers import internal_error_response, register_exception_handlers
+from .logging_config import RequestLoggerAdapter, setup_logging
+from .middleware import SelectiveGZipMiddleware
+from .models import engine, init_db, warm_db_pool
+from .request_context import request_id_var
+from .http_client import close_http_clients
 
 # Setup logging
 logger = setup_logging()
@@ -15,7 +23,8 @@ logger = setup_logging()
 app = FastAPI(
     title="LocalChat API",
     description="API for interacting with AI models hosted at user-configured endpoints",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -27,6 +36,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON responses; streamed replies are sent as-is
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1000, compresslevel=5)
+
+async def log_event_loop() -> None:
+    """Log which event loop implementation is serving requests"""
+    policy = type(asyncio.get_event_loop_policy())
+    logger.info("Event loop policy: %s.%s", policy.__module__, policy.__qualname__)
+
+# Worker threads for sync dependencies and file I/O (anyio defaults to 40)
+THREADPOOL_SIZE = int(os.getenv("LOCALCHAT_THREADPOOL_SIZE", "64"))
+
+async def configure_threadpool() -> None:
+    """Size the threadpool used for blocking work off the event loop"""
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+# Create database tables and open pooled connections on startup
+app.add_event_handler("startup", log_event_loop)
+app.add_event_handler("startup", configure_threadpool)
+app.add_event_handler("startup", init_db)
+app.add_event_handler("startup", warm_db_pool)
+
+# Close pooled HTTP and database connections on shutdown
+app.add_event_handler("shutdown", close_http_clients)
+app.add_event_handler("shutdown", engine.dispose)
+
 # Register custom exception handlers
 register_exception_handlers(app)
 
@@ -34,64 +68,70 @@ register_exception_handlers(app)
 @app.middleware("http")
 async def add_request_id_and_log(request: Request, call_next):
     # Generate a unique request ID
-    request_id = str(uuid.uuid4())
+    request_id = secrets.token_hex(8)
     request.state.request_id = request_id
+    request_id_var.set(request_id)
     
-    # Log the incoming request
-    logger.info(
-        f"Incoming request: {request.method} {request.url.path}",
-        extra={
-            "request_id": request_id,
-            "method": request.method,
-            "path": request.url.path,
-            "query_params": str(request.query_params),
-            "client_ip": request.client.host,
-            "user_agent": request.headers.get("user-agent", "Unknown")
-        }
+    method = request.method
+    path = request.url.path
+    req_log = RequestLoggerAdapter(
+        logger, {"request_id": request_id, "method": method, "path": path}
     )
+    log_info = logger.isEnabledFor(logging.INFO)
+    
+    # Log the incoming request
+    if log_info:
+        # request.client is None behind some proxies and ASGI servers
+        client = request.client
+        client_ip = client.host if client else request.headers.get("x-forwarded-for", "-")
+        req_log.info(
+            "Incoming request: %s %s",
+            method,
+            path,
+            extra={
+                "query_params": str(request.query_params),
+                "client_ip": client_ip,
+                "user_agent": request.headers.get("user-agent", "Unknown")
+            }
+        )
     
     # Measure request processing time
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     
     try:
         # Process the request
         response = await call_next(request)
         
         # Calculate processing time
-        process_time = time.time() - start_time
+        process_us = (time.perf_counter_ns() - start_ns) // 1000
         
         # Add request ID to response headers
         response.headers["X-Request-ID"] = request_id
         
         # Log the response
-        logger.info(
-            f"Request completed: {request.method} {request.url.path} - Status: {response.status_code}",
-            extra={
-                "request_id": request_id,
-                "status_code": response.status_code,
-                "processing_time": process_time
-            }
-        )
+        if log_info:
+            req_log.info(
+                "Request completed: %s %s - Status: %d",
+                method,
+                path,
+                response.status_code,
+                extra={
+                    "status_code": response.status_code,
+                    "processing_time_us": process_us
+                }
+            )
         
         return response
     except Exception as e:
         # Log any unhandled exceptions
-        logger.error(
-            f"Unhandled exception in request: {str(e)}",
-            extra={"request_id": request_id},
+        req_log.error(
+            "Unhandled exception in request: %s",
+            e,
             exc_info=True
         )
         
         # Return a 500 response
-        return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={
-                "error": True,
-                "code": "INTERNAL_SERVER_ERROR",
-                "message": "An unexpected error occurred",
-                "request_id": request_id
-            }
-        )
+        return internal_error_response(request_id)
 
 # Include API routes
 app.include_router(router, prefix="/api")
@@ -114,4 +154,28 @@ async def health_check():
     }
 
 if __name__ == "__main__":
-    uvicorn.run("localchat.main:app", host="0.0.0.0", port=8000, reload=True)
+    import uvicorn
+    
+    # uvloop and httptools replace the pure-Python event loop and HTTP parser;
+    # uvloop has no Windows build, so fall back to asyncio there.
+    # Auto-reload is meant for development only and runs a single process.
+    # Serve from one worker by default: the generation limit, the model list
+    # cache and SQLite's single writer all assume a single process, so extra
+    # workers (LOCALCHAT_WORKERS) multiply the limit and split the cache.
+    # Requests beyond the concurrency limit get a 503 instead of queueing
+    # inside the worker. On multi-socket hosts, pin the server to one socket
+    # (e.g. `taskset -c 0-7 python -m localchat.main`) to keep workers' caches
+    # local.
+    reload = os.getenv("LOCALCHAT_RELOAD", "").lower() in ("1", "true", "yes")
+    workers = 1 if reload else int(os.getenv("LOCALCHAT_WORKERS", "1"))
+    uvicorn.run(
+        "localchat.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop=os.getenv("LOCALCHAT_LOOP", "asyncio" if sys.platform == "win32" else "uvloop"),
+        http="httptools",
+        reload=reload,
+        workers=workers,
+        limit_concurrency=int(os.getenv("LOCALCHAT_LIMIT_CONCURRENCY", "200")),
+        backlog=int(os.getenv("LOCALCHAT_BACKLOG", "2048"))
+    )
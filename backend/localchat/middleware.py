@@ -0,0 +1,31 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Content types that must reach the client chunk by chunk
+UNCOMPRESSED_CONTENT_TYPES = ("text/event-stream", "application/x-ndjson")
+
+class SelectiveGZipResponder(GZipResponder):
+    """GZip responder that passes streaming responses through untouched"""
+
+    async def send_with_gzip(self, message: Message) -> None:
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if content_type.startswith(UNCOMPRESSED_CONTENT_TYPES):
+                # Reuse the pass-through path for already-encoded responses
+                self.content_encoding_set = True
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZip middleware that skips Server-Sent Events and NDJSON streams"""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            if "gzip" in headers.get("Accept-Encoding", ""):
+                responder = SelectiveGZipResponder(
+                    self.app, self.minimum_size, compresslevel=self.compresslevel
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -1,9 +1,13 @@
+import asyncio
+import os
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, create_engine
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Index, event, func, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
-from pydantic import BaseModel, Field
+from sqlalchemy.orm import relationship
+from pydantic import BaseModel, ConfigDict, Field
 
 # SQLAlchemy models
 Base = declarative_base()
@@ -17,7 +21,9 @@ class ProfileModel(Base):
     url = Column(String)
     model_name = Column(String)
     token_size = Column(Integer)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Set client-side with microseconds, since CURRENT_TIMESTAMP only has
+    # second resolution; server_default covers rows written outside the ORM
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     
     chats = relationship("ChatModel", back_populates="profile", cascade="all, delete-orphan")
 
@@ -26,8 +32,9 @@ class ChatModel(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, default="New Chat")
-    profile_id = Column(Integer, ForeignKey("profiles.id"))
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Indexed for per-profile listing; SQLite index entries also carry the id
+    profile_id = Column(Integer, ForeignKey("profiles.id"), index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     
     profile = relationship("ProfileModel", back_populates="chats")
     messages = relationship("MessageModel", back_populates="chat", cascade="all, delete-orphan")
@@ -39,17 +46,64 @@ class MessageModel(Base):
     chat_id = Column(Integer, ForeignKey("chats.id"))
     role = Column(String)  # "user" or "assistant"
     content = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     
     chat = relationship("ChatModel", back_populates="messages")
+    
+    # Chat history is always read per chat in creation order
+    __table_args__ = (Index("ix_messages_chat_id_created_at", "chat_id", "created_at"),)
 
 # Database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./localchat.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Create tables
-Base.metadata.create_all(bind=engine)
+SQLALCHEMY_DATABASE_URL = os.getenv("LOCALCHAT_DATABASE_URL", "sqlite+aiosqlite:///./localchat.db")
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL so readers don't block the writer, fsync less per commit, and enforce foreign keys"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+def _engine_options(url: URL) -> Dict[str, Any]:
+    """Engine keyword arguments for the configured database backend"""
+    options: Dict[str, Any] = {
+        # Compiled SQL cache shared by all select() constructs on this engine
+        "query_cache_size": 1200,
+        "pool_size": 20,
+        "max_overflow": 40,
+        # Fail fast when every connection is busy instead of queueing requests
+        "pool_timeout": 5,
+    }
+    if url.get_backend_name() == "sqlite":
+        # cached_statements sizes sqlite3's per-connection prepared statement cache
+        options["connect_args"] = {"check_same_thread": False, "cached_statements": 256}
+    else:
+        # Server connections can be dropped while idle; SQLite file connections
+        # never go stale, so only server databases pay for a ping per checkout
+        options.update(pool_pre_ping=True, pool_recycle=1800)
+    return options
+
+engine = create_async_engine(SQLALCHEMY_DATABASE_URL, **_engine_options(make_url(SQLALCHEMY_DATABASE_URL)))
+if engine.url.get_backend_name() == "sqlite":
+    event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+AsyncSessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+# Connections opened at startup so the first requests don't pay for them
+DB_POOL_WARM_SIZE = 5
+
+async def init_db() -> None:
+    """Create tables that don't exist yet"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+async def warm_db_pool(size: int = DB_POOL_WARM_SIZE) -> None:
+    """Open pooled connections up front (with WAL pragmas applied)"""
+    async def ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Held concurrently so each ping checks out a distinct connection
+    await asyncio.gather(*(ping() for _ in range(size)))
 
 # Pydantic models for API
 class ProfileBase(BaseModel):
@@ -65,10 +119,8 @@ class ProfileCreate(ProfileBase):
 class Profile(ProfileBase):
     id: int
     created_at: datetime
-    
-    class Config:
-        orm_mode = True
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 class MessageBase(BaseModel):
     role: str
@@ -81,10 +133,8 @@ class Message(MessageBase):
     id: int
     chat_id: int
     created_at: datetime
-    
-    class Config:
-        orm_mode = True
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 class ChatBase(BaseModel):
     title: str
@@ -97,12 +147,10 @@ class Chat(ChatBase):
     id: int
     created_at: datetime
     messages: List[Message] = []
-    
-    class Config:
-        orm_mode = True
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 class ModelRequest(BaseModel):
     model: str
     messages: List[Dict[str, str]]
-    max_tokens: Optional[int] = None
+    max_tokens: Optional[int] = Field(default=None)
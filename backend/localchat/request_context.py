@@ -0,0 +1,5 @@
+from contextvars import ContextVar
+from typing import Optional
+
+# ID of the request being handled, set by the request middleware in main.py
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
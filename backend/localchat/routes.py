@@ -1,25 +1,20 @@
-from typing import List, Optional, Dict, Any
+from functools import wraps
+from typing import List, Optional, Dict, Any, Type
 import logging
-import uuid
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+import orjson
+from pydantic import BaseModel, TypeAdapter
 
 from .models import (
     Profile, ProfileCreate,
     Chat, ChatCreate,
     Message, MessageCreate,
 )
-from .error_handlers import ModelAPIException, DatabaseException
+from .error_handlers import DatabaseException
 from .exceptions import (
-    # Profile exceptions
-    ProfileNotFoundError, ProfileCreationError, ProfileUpdateError, ProfileDeletionError,
-    # Chat exceptions
-    ChatNotFoundError, ChatCreationError, ChatDeletionError,
-    # Message exceptions
+    LocalChatException, DatabaseOperationError,
     MessageCreationError, MessageFetchError,
-    # Model/Provider exceptions
-    ModelInteractionError, ProviderConfigurationError,
-    # Generic exceptions
-    DatabaseOperationError
 )
 from .services.profile_service import ProfileService
 from .services.chat_service import ChatService
@@ -31,17 +26,67 @@ from .utils import get_db_dependency
 # Get logger
 logger = logging.getLogger("localchat")
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Dependency to get the database session
 get_db = get_db_dependency
 
+# Prebuilt serializers for the list endpoints. Returning the encoded body
+# directly skips FastAPI's response_model pass; response_model is kept on
+# the routes for the OpenAPI schema.
+_profile_list_adapter = TypeAdapter(List[Profile])
+_chat_list_adapter = TypeAdapter(List[Chat])
+_message_list_adapter = TypeAdapter(List[Message])
+
+# Nested response models that have to be built alongside their parent
+_NESTED_MODELS: Dict[Type[BaseModel], Dict[str, Type[BaseModel]]] = {
+    Chat: {"messages": Message},
+}
+
+def _construct(model: Type[BaseModel], row) -> BaseModel:
+    """Build a response model from a loaded row without validating it.
+
+    Rows come straight from our own tables, so they already match the schema.
+    """
+    values = {name: getattr(row, name) for name in model.model_fields}
+    for name, nested in _NESTED_MODELS.get(model, {}).items():
+        values[name] = [_construct(nested, item) for item in values[name]]
+    return model.model_construct(**values)
+
+def _list_response(adapter: TypeAdapter, model: Type[BaseModel], rows) -> Response:
+    items = [_construct(model, row) for row in rows]
+    return Response(content=adapter.dump_json(items), media_type="application/json")
+
+# Message failures are reported with the database error body
+_DATABASE_ERRORS = (MessageCreationError, MessageFetchError)
+
+def route_errors(endpoint):
+    """Translate service exceptions raised by an endpoint into HTTP errors"""
+    @wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await endpoint(*args, **kwargs)
+        except DatabaseOperationError:
+            # Rendered by the registered database error handler
+            raise
+        except _DATABASE_ERRORS as e:
+            logger.error("Error in %s: %s", endpoint.__name__, e, exc_info=True)
+            raise DatabaseException(detail=e.detail, original_exception=e.original_exception) from e
+        except LocalChatException as e:
+            if e.is_client_error:
+                logger.warning("Client error in %s: %s", endpoint.__name__, e)
+            else:
+                logger.error("Error in %s: %s", endpoint.__name__, e, exc_info=True)
+            raise HTTPException(status_code=e.status_code, detail=str(e)) from e
+    return wrapper
+
 # Provider endpoints
 @router.get("/models/ollama", response_model=List[Dict[str, Any]])
+@route_errors
 async def get_ollama_available_models(
-    request: Request, 
     base_url: Optional[str] = None,
     profile_id: Optional[int] = None,
+    no_cache: bool = Query(False, description="Bypass the cached model list"),
     provider_service: ProviderService = Depends(ProviderService)
 ):
     """
@@ -50,294 +95,159 @@ async def get_ollama_available_models(
     Args:
         base_url: Optional base URL for the Ollama API. Overrides profile settings if provided.
         profile_id: Optional profile ID to use for provider configuration.
+        no_cache: Fetch a fresh model list instead of a recently cached one.
         
     Returns:
         List of model information dictionaries
     """
-    request_id = str(uuid.uuid4())
     logger.info(
-        f"Fetching available Ollama models", 
+        "Fetching available Ollama models",
         extra={
-            "request_id": request_id,
-            "client_ip": request.client.host,
             "base_url": base_url or "from_profile" if profile_id else "default",
             "profile_id": profile_id
         }
     )
     
-    try:
-        models = await provider_service.list_models("ollama", profile_id, base_url)
-        return models
-    except ProviderConfigurationError as e:
-        logger.error(
-            f"Provider configuration error: {str(e)}",
-            extra={"request_id": request_id},
-            exc_info=True
-        )
-        raise HTTPException(
-            status_code=400 if e.is_client_error else 500,
-            detail=str(e)
-        )
-    except ModelInteractionError as e:
-        logger.error(
-            f"Error communicating with model provider: {str(e)}",
-            extra={"request_id": request_id},
-            exc_info=True
-        )
-        raise HTTPException(status_code=502, detail=str(e))
-    except Exception as e:
-        logger.error(
-            f"Unexpected error fetching Ollama models: {str(e)}",
-            extra={"request_id": request_id},
-            exc_info=True
-        )
-        raise HTTPException(status_code=500, detail="Internal server error")
+    models = await provider_service.list_models("ollama", profile_id, base_url, use_cache=not no_cache)
+    return models
 
 # Profile endpoints
 @router.post("/profiles/", response_model=Profile, status_code=201)
-def create_profile(profile: ProfileCreate, request: Request, profile_service: ProfileService = Depends(ProfileService)):
-    request_id = str(uuid.uuid4())
+@route_errors
+async def create_profile(profile: ProfileCreate, profile_service: ProfileService = Depends(ProfileService)):
     logger.info(
-        f"Creating new profile: {profile.name}", 
+        "Creating new profile: %s",
+        profile.name,
         extra={
-            "request_id": request_id,
-            "client_ip": request.client.host,
             "profile_name": profile.name
         }
     )
     
-    try:
-        db_profile = profile_service.create_profile(profile)
-        logger.info(
-            f"Successfully created profile: {profile.name} (ID: {db_profile.id})",
-            extra={"request_id": request_id, "profile_id": db_profile.id}
-        )
-        return db_profile
-    except ProfileCreationError as e:
-        logger.error(
-            f"Error creating profile: {str(e)}",
-            extra={"request_id": request_id},
-            exc_info=True
-        )
-        raise HTTPException(
-            status_code=400 if e.is_client_error else 500,
-            detail=str(e)
-        )
-    except DatabaseOperationError as e:
-        logger.error(
-            f"Database error creating profile: {str(e)}",
-            extra={"request_id": request_id},
-            exc_info=True
-        )
-        raise DatabaseException(
-            detail="Failed to create profile due to database error",
-            original_exception=e.original_exception
-        )
+    db_profile = await profile_service.create_profile(profile)
+    logger.info(
+        "Successfully created profile: %s (ID: %s)",
+        profile.name,
+        db_profile.id,
+        extra={"profile_id": db_profile.id}
+    )
+    return db_profile
 
 @router.get("/profiles/", response_model=List[Profile])
-def read_profiles(request: Request, skip: int = 0, limit: int = 100, profile_service: ProfileService = Depends(ProfileService)):
-    request_id = str(uuid.uuid4())
+@route_errors
+async def read_profiles(skip: int = 0, limit: int = 100, profile_service: ProfileService = Depends(ProfileService)):
     logger.info(
-        f"Fetching profiles (skip={skip}, limit={limit})",
+        "Fetching profiles (skip=%s, limit=%s)",
+        skip,
+        limit,
         extra={
-            "request_id": request_id,
-            "client_ip": request.client.host,
             "skip": skip,
             "limit": limit
         }
     )
     
-    try:
-        profiles = profile_service.get_profiles(skip, limit)
-        logger.info(
-            f"Successfully fetched {len(profiles)} profiles",
-            extra={"request_id": request_id, "count": len(profiles)}
-        )
-        return profiles
-    except DatabaseOperationError as e:
-        logger.error(
-            f"Database error fetching profiles: {str(e)}",
-            extra={"request_id": request_id},
-            exc_info=True
-        )
-        raise DatabaseException(
-            detail="Failed to fetch profiles due to database error",
-            original_exception=e.original_exception
-        )
+    profiles = await profile_service.get_profiles(skip, limit)
+    logger.info(
+        "Successfully fetched %d profiles",
+        len(profiles),
+        extra={"count": len(profiles)}
+    )
+    return _list_response(_profile_list_adapter, Profile, profiles)
 
 @router.get("/profiles/{profile_id}", response_model=Profile)
-def read_profile(profile_id: int, profile_service: ProfileService = Depends(ProfileService)):
-    try:
-        db_profile = profile_service.get_profile(profile_id)
-        return db_profile
-    except ProfileNotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except DatabaseOperationError as e:
-        logger.error(f"Database error retrieving profile {profile_id}: {e}", exc_info=True)
-        raise DatabaseException(
-            detail=f"Failed to retrieve profile {profile_id} due to database error",
-            original_exception=e.original_exception
-        )
+@route_errors
+async def read_profile(profile_id: int, profile_service: ProfileService = Depends(ProfileService)):
+    db_profile = await profile_service.get_profile(profile_id)
+    return db_profile
 
 @router.put("/profiles/{profile_id}", response_model=Profile)
-def update_profile(profile_id: int, profile: ProfileCreate, profile_service: ProfileService = Depends(ProfileService)):
-    try:
-        db_profile = profile_service.update_profile(profile_id, profile)
-        return db_profile
-    except ProfileNotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except ProfileUpdateError as e:
-        logger.error(f"Error updating profile {profile_id}: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=400 if e.is_client_error else 500,
-            detail=str(e)
-        )
-    except DatabaseOperationError as e:
-        logger.error(f"Database error updating profile {profile_id}: {e}", exc_info=True)
-        raise DatabaseException(
-            detail=f"Failed to update profile {profile_id} due to database error",
-            original_exception=e.original_exception
-        )
+@route_errors
+async def update_profile(profile_id: int, profile: ProfileCreate, profile_service: ProfileService = Depends(ProfileService)):
+    db_profile = await profile_service.update_profile(profile_id, profile)
+    return db_profile
 
 @router.delete("/profiles/{profile_id}", response_model=Dict[str, str])
-def delete_profile(profile_id: int, profile_service: ProfileService = Depends(ProfileService)):
-    try:
-        profile_service.delete_profile(profile_id)
-        return {"detail": "Profile deleted successfully"}
-    except ProfileNotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except ProfileDeletionError as e:
-        logger.error(f"Error deleting profile {profile_id}: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=400 if e.is_client_error else 500,
-            detail=str(e)
-        )
-    except DatabaseOperationError as e:
-        logger.error(f"Database error deleting profile {profile_id}: {e}", exc_info=True)
-        raise DatabaseException(
-            detail=f"Failed to delete profile {profile_id} due to database error",
-            original_exception=e.original_exception
-        )
+@route_errors
+async def delete_profile(profile_id: int, profile_service: ProfileService = Depends(ProfileService)):
+    await profile_service.delete_profile(profile_id)
+    return {"detail": "Profile deleted successfully"}
 
 # Chat endpoints
 @router.post("/chats/", response_model=Chat, status_code=201)
-def create_chat(chat: ChatCreate, chat_service: ChatService = Depends(ChatService)):
-    try:
-        db_chat = chat_service.create_chat(chat)
-        return db_chat
-    except ChatCreationError as e:
-        logger.error(f"Error creating chat: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=400 if e.is_client_error else 500,
-            detail=str(e)
-        )
-    except DatabaseOperationError as e:
-        logger.error(f"Database error creating chat: {e}", exc_info=True)
-        raise DatabaseException(
-            detail="Failed to create chat due to database error",
-            original_exception=e.original_exception
-        )
+@route_errors
+async def create_chat(chat: ChatCreate, chat_service: ChatService = Depends(ChatService)):
+    db_chat = await chat_service.create_chat(chat)
+    return db_chat
 
 @router.get("/chats/", response_model=List[Chat])
-def read_chats(
+@route_errors
+async def read_chats(
     profile_id: Optional[int] = Query(None, description="Filter chats by profile ID"),
     skip: int = 0, 
     limit: int = 100, 
+    after_id: Optional[int] = Query(None, description="Return chats after this ID (keyset pagination); skip is ignored when set"),
     chat_service: ChatService = Depends(ChatService)
 ):
-    try:
-        chats = chat_service.get_chats(profile_id, skip, limit)
-        return chats
-    except DatabaseOperationError as e:
-        logger.error(f"Database error retrieving chats: {e}", exc_info=True)
-        raise DatabaseException(
-            detail="Failed to retrieve chats due to database error",
-            original_exception=e.original_exception
-        )
+    chats = await chat_service.get_chats(profile_id, skip, limit, after_id)
+    return _list_response(_chat_list_adapter, Chat, chats)
 
 @router.get("/chats/{chat_id}", response_model=Chat)
-def read_chat(chat_id: int, chat_service: ChatService = Depends(ChatService)):
-    try:
-        db_chat = chat_service.get_chat(chat_id)
-        return db_chat
-    except ChatNotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except DatabaseOperationError as e:
-        logger.error(f"Database error retrieving chat {chat_id}: {e}", exc_info=True)
-        raise DatabaseException(
-            detail=f"Failed to retrieve chat {chat_id} due to database error",
-            original_exception=e.original_exception
-        )
+@route_errors
+async def read_chat(chat_id: int, chat_service: ChatService = Depends(ChatService)):
+    db_chat = await chat_service.get_chat(chat_id)
+    return db_chat
 
 @router.delete("/chats/{chat_id}", response_model=Dict[str, str])
-def delete_chat(chat_id: int, chat_service: ChatService = Depends(ChatService)):
-    try:
-        chat_service.delete_chat(chat_id)
-        return {"detail": "Chat deleted successfully"}
-    except ChatNotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except ChatDeletionError as e:
-        logger.error(f"Error deleting chat {chat_id}: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=400 if e.is_client_error else 500,
-            detail=str(e)
-        )
-    except DatabaseOperationError as e:
-        logger.error(f"Database error deleting chat {chat_id}: {e}", exc_info=True)
-        raise DatabaseException(
-            detail=f"Failed to delete chat {chat_id} due to database error",
-            original_exception=e.original_exception
-        )
+@route_errors
+async def delete_chat(chat_id: int, chat_service: ChatService = Depends(ChatService)):
+    await chat_service.delete_chat(chat_id)
+    return {"detail": "Chat deleted successfully"}
 
 # Message endpoints
 @router.get("/chats/{chat_id}/messages/", response_model=List[Message])
-def read_messages(
+@route_errors
+async def read_messages(
     chat_id: int, 
     request: Request,
     skip: int = 0, 
     limit: int = 100, 
+    format: str = Query("json", pattern="^(json|ndjson)$", description="Response format; ndjson streams one message per line"),
     message_service: MessageService = Depends(MessageService)
 ):
-    request_id = str(uuid.uuid4())
+    request_id = request.state.request_id
     logger.info(
-        f"Fetching messages for chat ID: {chat_id}",
+        "Fetching messages for chat ID: %s",
+        chat_id,
         extra={
-            "request_id": request_id,
-            "client_ip": request.client.host,
             "chat_id": chat_id,
             "skip": skip,
-            "limit": limit
+            "limit": limit,
+            "format": format
         }
     )
     
-    try:
-        # Use the message service to get messages
-        messages = message_service.get_messages(chat_id, skip, limit, request_id)
+    if format == "ndjson":
+        rows = await message_service.stream_messages(chat_id, skip, limit, request_id)
         
-        logger.info(
-            f"Successfully fetched {len(messages)} messages for chat ID: {chat_id}",
-            extra={"request_id": request_id, "count": len(messages)}
-        )
+        async def ndjson_lines():
+            async for row in rows:
+                yield orjson.dumps(_construct(Message, row).model_dump()) + b"\n"
         
-        return messages
-    except ChatNotFoundError as e:
-        logger.warning(
-            f"Attempted to fetch messages for non-existent chat: {chat_id}",
-            extra={"request_id": request_id}
-        )
-        raise HTTPException(status_code=404, detail=str(e))
-    except MessageFetchError as e:
-        logger.error(
-            f"Error fetching messages: {str(e)}",
-            extra={"request_id": request_id},
-            exc_info=True
-        )
-        raise DatabaseException(
-            detail="Failed to fetch messages due to database error",
-            original_exception=e.original_exception if hasattr(e, 'original_exception') else None
-        )
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+    
+    # Use the message service to get messages
+    messages = await message_service.get_messages(chat_id, skip, limit, request_id)
+    
+    logger.info(
+        "Successfully fetched %d messages for chat ID: %s",
+        len(messages),
+        chat_id,
+        extra={"count": len(messages)}
+    )
+    
+    return _list_response(_message_list_adapter, Message, messages)
 
 @router.post("/chats/{chat_id}/messages/", response_model=Message)
+@route_errors
 async def create_message(
     chat_id: int, 
     message: MessageCreate, 
@@ -345,12 +255,11 @@ async def create_message(
     stream: bool = Query(False, description="Whether to stream the response"),
     message_service: MessageService = Depends(MessageService)
 ):
-    request_id = str(uuid.uuid4())
+    request_id = request.state.request_id
     logger.info(
-        f"Creating new message in chat ID: {chat_id}",
+        "Creating new message in chat ID: %s",
+        chat_id,
         extra={
-            "request_id": request_id,
-            "client_ip": request.client.host,
             "chat_id": chat_id,
             "message_role": message.role,
             "content_length": len(message.content),
@@ -358,37 +267,6 @@ async def create_message(
         }
     )
     
-    try:
-        # Use the message service to create the message and get AI response
-        response = await message_service.create_message(chat_id, message, stream, request_id)
-        return response
-        
-    except ChatNotFoundError as e:
-        logger.warning(
-            f"Attempted to create message in non-existent chat: {chat_id}",
-            extra={"request_id": request_id}
-        )
-        raise HTTPException(status_code=404, detail=str(e))
-        
-    except ProfileNotFoundError as e:
-        logger.error(
-            f"Profile not found for chat {chat_id}",
-            extra={"request_id": request_id}
-        )
-        raise HTTPException(status_code=404, detail=str(e))
-        
-    except MessageCreationError as e:
-        logger.error(
-            f"Error creating message: {str(e)}",
-            extra={"request_id": request_id},
-            exc_info=True
-        )
-        raise DatabaseException(
-            detail="Failed to create message due to database error",
-            original_exception=e.original_exception if hasattr(e, 'original_exception') else None
-        )
-        
-    except ModelAPIException as e:
-        # This exception already has detailed error info and has been logged
-        # Just pass it through to be handled by the exception handler
-        raise
+    # Use the message service to create the message and get AI response
+    response = await message_service.create_message(chat_id, message, stream, request_id)
+    return response
@@ -20,8 +20,10 @@ class AdapterFactory:
         "custom": CustomAdapter
     }
     
-    # Cache of adapter instances
-    _adapter_instances: Dict[str, ModelProviderAdapter] = {}
+    # One shared instance per provider, created up front
+    _adapter_instances: Dict[str, ModelProviderAdapter] = {
+        name: adapter_class() for name, adapter_class in _adapter_classes.items()
+    }
     
     @classmethod
     def get_adapter(cls, provider: str) -> ModelProviderAdapter:
@@ -34,23 +36,13 @@ class AdapterFactory:
         Returns:
             An instance of the appropriate ModelProviderAdapter
         """
-        # Convert provider name to lowercase for case-insensitive matching
-        provider_key = provider.lower()
-        
-        # Check if we already have an instance for this provider
-        if provider_key in cls._adapter_instances:
-            return cls._adapter_instances[provider_key]
-        
-        # Get the adapter class
-        adapter_class = cls._adapter_classes.get(provider_key, CustomAdapter)
-        
-        # Create a new instance
-        adapter = adapter_class()
-        
-        # Cache the instance
-        cls._adapter_instances[provider_key] = adapter
+        # Provider names are normally stored in lowercase already
+        adapter = cls._adapter_instances.get(provider)
+        if adapter is not None:
+            return adapter
         
-        return adapter
+        # Fall back to case-insensitive matching, then to the custom adapter
+        return cls._adapter_instances.get(provider.lower()) or cls._adapter_instances["custom"]
     
     @classmethod
     def register_adapter(cls, provider: str, adapter_class: Type[ModelProviderAdapter]) -> None:
@@ -64,6 +56,5 @@ class AdapterFactory:
         provider_key = provider.lower()
         cls._adapter_classes[provider_key] = adapter_class
         
-        # Clear any cached instance
-        if provider_key in cls._adapter_instances:
-            del cls._adapter_instances[provider_key]
+        # Replace any existing instance
+        cls._adapter_instances[provider_key] = adapter_class()
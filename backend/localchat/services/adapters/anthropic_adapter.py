@@ -3,11 +3,15 @@ from typing import Dict, Any, List, Optional
 from localchat.models import MessageModel
 from localchat.services.adapters.base_adapter import ModelProviderAdapter
 
+# Anthropic only accepts user/assistant turns; anything else is sent as assistant
+_ANTHROPIC_ROLES = {"user": "user", "assistant": "assistant"}
+
 
 class AnthropicAdapter(ModelProviderAdapter):
     """
     Adapter for the Anthropic API.
     """
+    __slots__ = ()
     
     def format_url(self, base_url: str) -> str:
         """
@@ -46,13 +50,11 @@ class AnthropicAdapter(ModelProviderAdapter):
         """
         # Format messages for Anthropic API
         system = system_prompt or ""
-        messages_content = []
-
-        for msg in messages:
-            messages_content.append({
-                "role": "user" if msg.role == "user" else "assistant",
-                "content": msg.content
-            })
+        role_for = _ANTHROPIC_ROLES.get
+        messages_content = [
+            {"role": role_for(msg.role, "assistant"), "content": msg.content}
+            for msg in messages
+        ]
 
         # Prepare the Anthropic request payload
         payload = {
@@ -9,6 +9,7 @@ class ModelProviderAdapter(ABC):
     Base adapter class for model providers.
     Defines the interface that all provider adapters must implement.
     """
+    __slots__ = ()
     
     @abstractmethod
     def format_url(self, base_url: str) -> str:
@@ -5,11 +5,69 @@ from localchat.services.adapters.base_adapter import ModelProviderAdapter
 from localchat.utils import extract_response_text as utils_extract_response_text
 
 
+def _chunk_text_from_choices(choices: Any) -> Optional[str]:
+    """OpenAI format"""
+    if choices:
+        delta = choices[0].get("delta")
+        if delta and "content" in delta:
+            return delta["content"]
+    return None
+
+def _chunk_text_from_delta(delta: Any) -> Optional[str]:
+    """Anthropic format"""
+    if "text" in delta:
+        return delta["text"]
+    return None
+
+def _chunk_text_as_is(value: Any) -> Optional[str]:
+    """Formats that put the text directly under their key"""
+    return value
+
+# Top-level key that identifies each known streaming chunk format, in the
+# order they are tried: OpenAI ("choices"), Ollama ("response"), Anthropic
+# ("delta"), the older Anthropic API ("completion") and Cohere ("text")
+_CHUNK_TEXT_EXTRACTORS = (
+    ("choices", _chunk_text_from_choices),
+    ("response", _chunk_text_as_is),
+    ("delta", _chunk_text_from_delta),
+    ("completion", _chunk_text_as_is),
+    ("text", _chunk_text_as_is),
+)
+
+def _final_from_choices(choices: Any) -> Optional[bool]:
+    """OpenAI format"""
+    if choices:
+        return choices[0].get("finish_reason") is not None
+    return None
+
+def _final_from_done(done: Any) -> Optional[bool]:
+    """Ollama format"""
+    return done
+
+def _final_from_type(event_type: Any) -> Optional[bool]:
+    """Anthropic format"""
+    return event_type == "message_stop"
+
+# Statistics reported on the final chunk, under "usage" for OpenAI and at the
+# top level for Ollama
+_OPENAI_STATS = ("prompt_tokens", "completion_tokens", "total_tokens")
+_OLLAMA_STATS = ("eval_count", "eval_duration", "total_duration")
+
+# Key that marks the end-of-stream signal for each format; the first key
+# present decides
+_FINAL_CHUNK_CHECKS = (
+    ("choices", _final_from_choices),
+    ("done", _final_from_done),
+    ("type", _final_from_type),
+)
+
+
 class CustomAdapter(ModelProviderAdapter):
     """
     Default adapter for custom or unknown model providers.
     Uses a generic OpenAI-like format for requests and handles various response formats.
     """
+    __slots__ = ()
     
     def format_url(self, base_url: str) -> str:
         """
@@ -45,15 +103,16 @@ class CustomAdapter(ModelProviderAdapter):
         Returns:
             The formatted request payload
         """
+        # Start with the system prompt if provided, so it never has to be
+        # inserted in front of the history afterwards
+        formatted_messages = (
+            [{"role": "system", "content": system_prompt}] if system_prompt else []
+        )
         # Format messages in OpenAI-like format
-        formatted_messages = [
+        formatted_messages.extend(
             {"role": msg.role, "content": msg.content}
             for msg in messages
-        ]
-
-        # Add system prompt if provided
-        if system_prompt:
-            formatted_messages.insert(0, {"role": "system", "content": system_prompt})
+        )
 
         # Prepare a generic request payload
         payload = {
@@ -89,27 +148,11 @@ class CustomAdapter(ModelProviderAdapter):
         Returns:
             The extracted text, or None if no text could be extracted
         """
-        # Try OpenAI format
-        if "choices" in chunk_data and len(chunk_data["choices"]) > 0:
-            choice = chunk_data["choices"][0]
-            if "delta" in choice and "content" in choice["delta"]:
-                return choice["delta"]["content"]
-                
-        # Try Ollama format
-        if "response" in chunk_data:
-            return chunk_data["response"]
-            
-        # Try Anthropic format
-        if "delta" in chunk_data and "text" in chunk_data["delta"]:
-            return chunk_data["delta"]["text"]
-            
-        # Try Anthropic older format
-        if "completion" in chunk_data:
-            return chunk_data["completion"]
-            
-        # Try Cohere format
-        if "text" in chunk_data:
-            return chunk_data["text"]
+        for key, extract in _CHUNK_TEXT_EXTRACTORS:
+            if key in chunk_data:
+                text = extract(chunk_data[key])
+                if text is not None:
+                    return text
             
         return None
     
@@ -124,17 +167,11 @@ class CustomAdapter(ModelProviderAdapter):
         Returns:
             True if this is the final chunk, False otherwise
         """
-        # Try OpenAI format
-        if "choices" in chunk_data and len(chunk_data["choices"]) > 0:
-            return chunk_data["choices"][0].get("finish_reason") is not None
-            
-        # Try Ollama format
-        if "done" in chunk_data:
-            return chunk_data["done"]
-            
-        # Try Anthropic format
-        if "type" in chunk_data:
-            return chunk_data["type"] == "message_stop"
+        for key, check in _FINAL_CHUNK_CHECKS:
+            if key in chunk_data:
+                final = check(chunk_data[key])
+                if final is not None:
+                    return final
             
         return False
     
@@ -149,24 +186,11 @@ class CustomAdapter(ModelProviderAdapter):
         Returns:
             A dictionary of statistics
         """
-        stats = {}
-        
         # Try OpenAI format
-        if "usage" in final_chunk:
-            usage = final_chunk["usage"]
-            if "prompt_tokens" in usage:
-                stats["prompt_tokens"] = usage["prompt_tokens"]
-            if "completion_tokens" in usage:
-                stats["completion_tokens"] = usage["completion_tokens"]
-            if "total_tokens" in usage:
-                stats["total_tokens"] = usage["total_tokens"]
+        usage = final_chunk.get("usage")
+        stats = {key: usage[key] for key in _OPENAI_STATS if key in usage} if usage else {}
                 
         # Try Ollama format
-        if "eval_count" in final_chunk:
-            stats["eval_count"] = final_chunk["eval_count"]
-        if "eval_duration" in final_chunk:
-            stats["eval_duration"] = final_chunk["eval_duration"]
-        if "total_duration" in final_chunk:
-            stats["total_duration"] = final_chunk["total_duration"]
+        stats.update((key, final_chunk[key]) for key in _OLLAMA_STATS if key in final_chunk)
             
         return stats
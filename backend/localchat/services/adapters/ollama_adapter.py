@@ -3,11 +3,15 @@ from typing import Dict, Any, List, Optional
 from localchat.models import MessageModel
 from localchat.services.adapters.base_adapter import ModelProviderAdapter
 
+# Speaker labels for the flattened prompt; non-user turns read as the assistant
+_OLLAMA_ROLE_PREFIXES = {"user": "User: ", "assistant": "Assistant: "}
+
 
 class OllamaAdapter(ModelProviderAdapter):
     """
     Adapter for the Ollama API.
     """
+    __slots__ = ()
     
     def format_url(self, base_url: str) -> str:
         """
@@ -49,16 +53,21 @@ class OllamaAdapter(ModelProviderAdapter):
         Returns:
             The formatted request payload
         """
-        # Format the prompt based on the conversation history for Ollama
-        prompt = ""
+        # Format the prompt based on the conversation history for Ollama,
+        # collecting the pieces and joining once instead of growing a string
+        parts = []
+        append = parts.append
+        prefix_for = _OLLAMA_ROLE_PREFIXES.get
 
         # Add previous messages to provide context
         for msg in messages:
-            role_prefix = "User: " if msg.role == "user" else "Assistant: "
-            prompt += f"{role_prefix}{msg.content}\n\n"
+            append(prefix_for(msg.role, "Assistant: "))
+            append(msg.content)
+            append("\n\n")
 
         # Add the final prompt for the assistant to respond to
-        prompt += "Assistant: "
+        append("Assistant: ")
+        prompt = "".join(parts)
 
         # Prepare the Ollama request payload
         payload = {
@@ -8,6 +8,7 @@ class OpenAIAdapter(ModelProviderAdapter):
     """
     Adapter for the OpenAI API.
     """
+    __slots__ = ()
     
     def format_url(self, base_url: str) -> str:
         """
@@ -44,15 +45,16 @@ class OpenAIAdapter(ModelProviderAdapter):
         Returns:
             The formatted request payload
         """
+        # Start with the system prompt if provided, so it never has to be
+        # inserted in front of the history afterwards
+        formatted_messages = (
+            [{"role": "system", "content": system_prompt}] if system_prompt else []
+        )
         # Format messages for OpenAI API
-        formatted_messages = [
+        formatted_messages.extend(
             {"role": msg.role, "content": msg.content}
             for msg in messages
-        ]
-
-        # Add system prompt if provided
-        if system_prompt:
-            formatted_messages.insert(0, {"role": "system", "content": system_prompt})
+        )
 
         # Prepare the OpenAI request payload
         payload = {
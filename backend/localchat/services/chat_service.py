@@ -2,21 +2,22 @@ import logging
 from typing import List, Optional
 
 from fastapi import Depends
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 # Import the actual SQLAlchemy models
-from localchat.models import ChatModel, ChatCreate
+from localchat.models import ChatModel, ChatCreate, MessageModel
 # Import Pydantic schemas from schemas module
 from localchat.utils import get_db_dependency
 from localchat.exceptions import (
     ChatNotFoundError,
     ChatCreationError,
     ChatDeletionError,
-    ProfileNotFoundError,
     DatabaseOperationError
 )
-from localchat.services.profile_service import ProfileService
 
 logger = logging.getLogger(__name__)
 
@@ -24,21 +25,16 @@ logger = logging.getLogger(__name__)
 class ChatService:
     """Service layer for chat session operations."""
 
-    def __init__(
-        self,
-        db: Session = Depends(get_db_dependency),
-        profile_service: ProfileService = Depends(ProfileService)
-    ):
+    def __init__(self, db: AsyncSession = Depends(get_db_dependency)):
         """
-        Initializes the ChatService with database and profile service dependencies.
+        Initializes the ChatService with a database session dependency.
 
         Args:
-            db: The SQLAlchemy Session object injected by FastAPI.
-            profile_service: The ProfileService instance injected by FastAPI.
+            db: The SQLAlchemy AsyncSession object injected by FastAPI.
         """
         self.db = db
-        self.profile_service = profile_service
-    def create_chat(self, chat_data: ChatCreate) -> ChatModel:
+
+    async def create_chat(self, chat_data: ChatCreate) -> ChatModel:
         """
         Creates a new chat session.
 
@@ -49,35 +45,32 @@ class ChatService:
             The newly created ChatModel object.
 
         Raises:
-            ChatCreationError: If the profile ID is invalid or a database error occurs.
+            ChatCreationError: If the profile ID does not exist or a database error occurs.
         """
-        logger.info(f"Attempting to create chat: {chat_data.title} for profile {chat_data.profile_id}")
-        # Validate profile exists using injected service
-        try:
-            self.profile_service.get_profile(chat_data.profile_id)
-            logger.debug(f"Profile {chat_data.profile_id} validated successfully for new chat.")
-        except ProfileNotFoundError as e:
-            logger.error(f"Cannot create chat: Profile {chat_data.profile_id} not found.", exc_info=False)
-            # Raise ChatCreationError indicating precondition failure
-            raise ChatCreationError(f"Cannot create chat: Profile {chat_data.profile_id} not found", is_client_error=True) from e
-        except DatabaseOperationError as e:
-            logger.error(f"Cannot create chat due to DB error validating profile {chat_data.profile_id}: {e}", exc_info=True)
-            raise ChatCreationError(f"Cannot create chat due to DB error validating profile {chat_data.profile_id}") from e
-
-        # Proceed with chat creation
-        db_chat = ChatModel(**chat_data.dict())
+        logger.info("Attempting to create chat: %s for profile %s", chat_data.title, chat_data.profile_id)
         try:
-            self.db.add(db_chat)
-            self.db.commit()
-            self.db.refresh(db_chat)
-            logger.info(f"Successfully created chat: {db_chat.title} (ID: {db_chat.id})")
+            # RETURNING hands back the generated id and created_at with the
+            # INSERT itself, so no refresh SELECT is needed afterwards
+            result = await self.db.execute(
+                insert(ChatModel).values(**chat_data.model_dump()).returning(ChatModel)
+            )
+            db_chat = result.scalar_one()
+            # A new chat has no messages; mark that as loaded for the response
+            set_committed_value(db_chat, "messages", [])
+            await self.db.commit()
+            logger.info("Successfully created chat: %s (ID: %s)", db_chat.title, db_chat.id)
             return db_chat
+        except IntegrityError as e:
+            # The profile foreign key is the only constraint a new chat can break
+            await self.db.rollback()
+            logger.error("Cannot create chat: Profile %s not found.", chat_data.profile_id, exc_info=False)
+            raise ChatCreationError(f"Cannot create chat: Profile {chat_data.profile_id} not found", is_client_error=True) from e
         except SQLAlchemyError as e:
-            self.db.rollback()
-            logger.error(f"Database error creating chat '{chat_data.title}': {e}", exc_info=True)
+            await self.db.rollback()
+            logger.error("Database error creating chat '%s': %s", chat_data.title, e, exc_info=True)
             raise ChatCreationError(f"Database error creating chat '{chat_data.title}'", original_exception=e)
 
-    def get_chat(self, chat_id: int) -> ChatModel:
+    async def get_chat(self, chat_id: int) -> ChatModel:
         """
         Retrieves a single chat session by its ID.
 
@@ -91,26 +84,37 @@ class ChatService:
             ChatNotFoundError: If the chat with the given ID does not exist.
             DatabaseOperationError: If a database error occurs during retrieval.
         """
-        logger.debug(f"Attempting to retrieve chat with id: {chat_id}")
+        logger.debug("Attempting to retrieve chat with id: %s", chat_id)
         try:
-            chat = self.db.query(ChatModel).filter(ChatModel.id == chat_id).first()
+            chat = await self.db.get(ChatModel, chat_id, options=[selectinload(ChatModel.messages)])
             if not chat:
-                logger.warning(f"Chat not found with id: {chat_id}")
+                logger.warning("Chat not found with id: %s", chat_id)
                 raise ChatNotFoundError(f"Chat with id {chat_id} not found")
-            logger.debug(f"Successfully retrieved chat: {chat.title} (ID: {chat_id})")
+            logger.debug("Successfully retrieved chat: %s (ID: %s)", chat.title, chat_id)
             return chat
         except SQLAlchemyError as e:
-            logger.error(f"Database error retrieving chat {chat_id}: {e}", exc_info=True)
+            logger.error("Database error retrieving chat %s: %s", chat_id, e, exc_info=True)
             raise DatabaseOperationError(f"Database error retrieving chat {chat_id}", original_exception=e)
 
-    def get_chats(self, profile_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[ChatModel]:
+    async def get_chats(
+        self,
+        profile_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
+    ) -> List[ChatModel]:
         """
         Retrieves a list of chat sessions with pagination, optionally filtered by profile.
 
+        Chats are returned in ID order. Pass the last ID of the previous page as
+        after_id to page by key; its cost doesn't grow with depth the way skip does,
+        so skip is ignored when after_id is given.
+
         Args:
             profile_id: Optional ID of the profile to filter chats by.
-            skip: Number of chats to skip.
+            skip: Number of chats to skip; ignored when after_id is given.
             limit: Maximum number of chats to return.
+            after_id: Optional ID; only chats with a greater ID are returned.
 
         Returns:
             A list of ChatModel objects.
@@ -118,19 +122,27 @@ class ChatService:
         Raises:
             DatabaseOperationError: If a database error occurs during retrieval.
         """
-        logger.debug(f"Attempting to retrieve chats" + (f" for profile {profile_id}" if profile_id else "") + f" (skip={skip}, limit={limit})")
+        logger.debug(
+            "Attempting to retrieve chats (profile_id=%s, skip=%s, limit=%s, after_id=%s)",
+            profile_id, skip, limit, after_id
+        )
         try:
-            query = self.db.query(ChatModel)
+            query = select(ChatModel).options(selectinload(ChatModel.messages)).order_by(ChatModel.id)
             if profile_id is not None:
-                query = query.filter(ChatModel.profile_id == profile_id)
-            chats = query.offset(skip).limit(limit).all()
-            logger.debug(f"Successfully retrieved {len(chats)} chats")
+                query = query.where(ChatModel.profile_id == profile_id)
+            if after_id is not None:
+                query = query.where(ChatModel.id > after_id)
+            elif skip:
+                query = query.offset(skip)
+            result = await self.db.execute(query.limit(limit))
+            chats = result.scalars().all()
+            logger.debug("Successfully retrieved %d chats", len(chats))
             return chats
         except SQLAlchemyError as e:
-            logger.error(f"Database error retrieving chats: {e}", exc_info=True)
+            logger.error("Database error retrieving chats: %s", e, exc_info=True)
             raise DatabaseOperationError("Database error retrieving chats", original_exception=e)
 
-    def delete_chat(self, chat_id: int) -> None:
+    async def delete_chat(self, chat_id: int) -> None:
         """
         Deletes a chat session.
 
@@ -141,16 +153,23 @@ class ChatService:
             ChatNotFoundError: If the chat with the given ID does not exist.
             ChatDeletionError: If the chat cannot be deleted due to a database error.
         """
-        logger.info(f"Attempting to delete chat with id: {chat_id}")
-        db_chat = self.get_chat(chat_id)  # This will raise ChatNotFoundError if not found
-
+        logger.info("Attempting to delete chat with id: %s", chat_id)
         try:
-            self.db.delete(db_chat)
-            self.db.commit()
-            logger.info(f"Successfully deleted chat: {db_chat.title} (ID: {chat_id})")
+            # Messages first, as the foreign key requires; neither the chat
+            # nor its messages need to be loaded to delete them
+            await self.db.execute(delete(MessageModel).where(MessageModel.chat_id == chat_id))
+            result = await self.db.execute(
+                delete(ChatModel).where(ChatModel.id == chat_id).returning(ChatModel.id)
+            )
+            if result.scalar_one_or_none() is None:
+                await self.db.rollback()
+                logger.warning("Chat not found with id: %s", chat_id)
+                raise ChatNotFoundError(f"Chat with id {chat_id} not found")
+            await self.db.commit()
+            logger.info("Successfully deleted chat with id: %s", chat_id)
         except SQLAlchemyError as e:
-            self.db.rollback()
-            logger.error(f"Database error deleting chat {chat_id}: {e}", exc_info=True)
+            await self.db.rollback()
+            logger.error("Database error deleting chat %s: %s", chat_id, e, exc_info=True)
             raise ChatDeletionError(f"Database error deleting chat {chat_id}", original_exception=e)
             
     # def update_chat(self, chat_id: int, chat_data: ChatUpdate) -> ChatModel:
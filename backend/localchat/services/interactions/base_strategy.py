@@ -1,9 +1,15 @@
 from abc import ABC, abstractmethod
 from typing import AsyncGenerator, Any, Optional, List
 
+import httpx
+
+from localchat.http_client import get_model_http_client
 from localchat.models import MessageModel
 from localchat.services.adapters.base_adapter import ModelProviderAdapter
 
+# Headers for request bodies that are sent as pre-encoded JSON bytes
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class ModelInteractionStrategy(ABC):
     """
@@ -11,6 +17,22 @@ class ModelInteractionStrategy(ABC):
     Defines the interface that all interaction strategies must implement.
     """
     
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize the strategy with the HTTP client used to reach the model API.
+        
+        Args:
+            http_client: Client to send requests with; defaults to the shared
+                model API client so connections are reused across requests
+        """
+        self._http_client = http_client
+    
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """The client to send requests with, looked up per call so a shared
+        client rebuilt after shutdown is picked up"""
+        return self._http_client or get_model_http_client()
+    
     @abstractmethod
     async def execute(
         self, 
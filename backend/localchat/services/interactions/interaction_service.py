@@ -1,8 +1,13 @@
+import asyncio
 import logging
+import os
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import AsyncGenerator, Optional, List
 
 from fastapi import Depends
 
+from localchat.error_handlers import ModelBusyException
 from localchat.models import MessageModel
 from localchat.services.adapters.adapter_factory import AdapterFactory
 from localchat.services.adapters.base_adapter import ModelProviderAdapter
@@ -12,6 +17,15 @@ from localchat.services.interactions.non_streaming_strategy import NonStreamingI
 # Get logger
 logger = logging.getLogger("localchat")
 
+# Upper bound on model generations in flight at once. It sits well above
+# Ollama's default of 4 parallel requests per model, so it only engages when
+# requests genuinely pile up rather than queueing ordinary multi-tab use.
+MAX_CONCURRENT_GENERATIONS = int(os.getenv("LOCALCHAT_MAX_CONCURRENT_GENERATIONS", "16"))
+
+# Seconds a request waits for a free generation slot before it is answered
+# with 503 instead of hanging behind long-running streams
+GENERATION_QUEUE_TIMEOUT = float(os.getenv("LOCALCHAT_GENERATION_QUEUE_TIMEOUT", "10"))
+
 
 class ModelInteractionService:
     """
@@ -33,6 +47,42 @@ class ModelInteractionService:
         """
         self.streaming_strategy = streaming_strategy
         self.non_streaming_strategy = non_streaming_strategy
+        self._generation_slots = asyncio.Semaphore(MAX_CONCURRENT_GENERATIONS)
+    
+    @asynccontextmanager
+    async def _generation_slot(self):
+        """
+        Hold one generation slot for the duration of the block.
+        
+        Raises:
+            ModelBusyException: If no slot frees up within GENERATION_QUEUE_TIMEOUT
+        """
+        # The acquire runs as its own shielded task so that a slot granted just
+        # as the wait ends can still be seen and handed back; wait_for alone
+        # drops such a slot on Python < 3.12
+        acquire = asyncio.ensure_future(self._generation_slots.acquire())
+        try:
+            await asyncio.wait_for(asyncio.shield(acquire), GENERATION_QUEUE_TIMEOUT)
+        except asyncio.CancelledError:
+            self._abandon_acquire(acquire)
+            raise
+        except asyncio.TimeoutError:
+            self._abandon_acquire(acquire)
+            logger.warning(
+                "No generation slot free after %.1fs (%d in use)",
+                GENERATION_QUEUE_TIMEOUT,
+                MAX_CONCURRENT_GENERATIONS
+            )
+            raise ModelBusyException()
+        try:
+            yield
+        finally:
+            self._generation_slots.release()
+    
+    def _abandon_acquire(self, acquire: asyncio.Future) -> None:
+        """Cancel a pending slot acquire, releasing the slot if it was already granted"""
+        if not acquire.cancel():
+            self._generation_slots.release()
     
     async def execute_streaming(
         self,
@@ -58,21 +108,26 @@ class ModelInteractionService:
             
         Yields:
             Chunks of the streaming response
+            
+        Raises:
+            ModelBusyException: If no generation slot frees up in time
         """
         # Get the appropriate adapter for this provider
         adapter = AdapterFactory.get_adapter(provider)
         
-        # Execute the streaming strategy
-        async for chunk in self.streaming_strategy.execute(
-            adapter=adapter,
-            url=url,
-            model_name=model_name,
-            messages=messages,
-            token_size=token_size,
-            system_prompt=system_prompt,
-            temperature=temperature
-        ):
-            yield chunk
+        # Execute the streaming strategy, holding a generation slot until
+        # the stream is finished
+        async with self._generation_slot():
+            async for chunk in self.streaming_strategy.execute(
+                adapter=adapter,
+                url=url,
+                model_name=model_name,
+                messages=messages,
+                token_size=token_size,
+                system_prompt=system_prompt,
+                temperature=temperature
+            ):
+                yield chunk
     
     async def execute_non_streaming(
         self,
@@ -98,17 +153,35 @@ class ModelInteractionService:
             
         Returns:
             The model's response text
+            
+        Raises:
+            ModelBusyException: If no generation slot frees up in time
         """
         # Get the appropriate adapter for this provider
         adapter = AdapterFactory.get_adapter(provider)
         
         # Execute the non-streaming strategy
-        return await self.non_streaming_strategy.execute(
-            adapter=adapter,
-            url=url,
-            model_name=model_name,
-            messages=messages,
-            token_size=token_size,
-            system_prompt=system_prompt,
-            temperature=temperature
-        )
+        async with self._generation_slot():
+            return await self.non_streaming_strategy.execute(
+                adapter=adapter,
+                url=url,
+                model_name=model_name,
+                messages=messages,
+                token_size=token_size,
+                system_prompt=system_prompt,
+                temperature=temperature
+            )
+
+
+@lru_cache(maxsize=None)
+def get_interaction_service() -> ModelInteractionService:
+    """
+    Dependency provider for a shared ModelInteractionService.
+
+    The service and its strategies hold no per-request state, so one
+    instance is reused instead of being rebuilt for every request.
+    """
+    return ModelInteractionService(
+        streaming_strategy=StreamingInteractionStrategy(),
+        non_streaming_strategy=NonStreamingInteractionStrategy()
+    )
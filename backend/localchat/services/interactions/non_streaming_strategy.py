@@ -1,13 +1,13 @@
-import json
 import logging
 from typing import Optional, List, Dict, Any
 
 import httpx
+import orjson
 
 from localchat.error_handlers import ModelAPIException
 from localchat.models import MessageModel
 from localchat.services.adapters.base_adapter import ModelProviderAdapter
-from localchat.services.interactions.base_strategy import ModelInteractionStrategy
+from localchat.services.interactions.base_strategy import JSON_HEADERS, ModelInteractionStrategy
 
 # Get logger
 logger = logging.getLogger("localchat")
@@ -65,7 +65,8 @@ class NonStreamingInteractionStrategy(ModelInteractionStrategy):
             payload["temperature"] = temperature
 
         logger.info(
-            f"Sending request to model API at {formatted_url}",
+            "Sending request to model API at %s",
+            formatted_url,
             extra={
                 "model": model_name,
                 "token_size": token_size,
@@ -75,36 +76,38 @@ class NonStreamingInteractionStrategy(ModelInteractionStrategy):
 
         try:
             # Send the request to the API
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(formatted_url, json=payload)
+            response = await self.http_client.post(
+                formatted_url,
+                content=orjson.dumps(payload),
+                headers=JSON_HEADERS
+            )
 
-                # Check if the request was successful
-                response.raise_for_status()
+            # Check if the request was successful
+            response.raise_for_status()
 
-                # Parse the response
-                response_data = response.json()
+            # Parse the response
+            response_data = orjson.loads(response.content)
 
+            if logger.isEnabledFor(logging.DEBUG):
                 logger.debug(
-                    f"Received response from model API",
-                    extra={"response_data": json.dumps(response_data)[:1000]}  # Limit log size
+                    "Received response from model API",
+                    extra={"response_data": orjson.dumps(response_data)[:1000].decode(errors="ignore")}  # Limit log size
                 )
 
-                # Extract the response text using the adapter
-                response_text = adapter.extract_response_text(response_data)
+            # Extract the response text using the adapter
+            response_text = adapter.extract_response_text(response_data)
 
-                if response_text:
-                    return response_text
-                else:
-                    # If we can't extract the response text, raise an exception
-                    raise ModelAPIException(
-                        detail="Unable to parse model response",
-                        response_data=response_data
-                    )
+            if response_text:
+                return response_text
+            else:
+                # If we can't extract the response text, raise an exception
+                raise ModelAPIException(
+                    detail="Unable to parse model response",
+                    response_data=response_data
+                )
 
         except httpx.HTTPStatusError as e:
             # Handle HTTP errors from the model API
-            error_message = f"Model API returned error status: {e.response.status_code}"
-
             try:
                 error_data = e.response.json()
                 error_detail = error_data.get("error", {}).get("message", str(e))
@@ -112,7 +115,8 @@ class NonStreamingInteractionStrategy(ModelInteractionStrategy):
                 error_detail = e.response.text[:500] if e.response.text else str(e)
 
             logger.error(
-                f"HTTP error from model API: {error_message}",
+                "HTTP error from model API: Model API returned error status: %d",
+                e.response.status_code,
                 extra={
                     "status_code": e.response.status_code,
                     "error_detail": error_detail
@@ -126,18 +130,16 @@ class NonStreamingInteractionStrategy(ModelInteractionStrategy):
 
         except httpx.RequestError as e:
             # Handle network/connection errors
-            error_message = f"Error connecting to model API: {str(e)}"
-            logger.error(error_message)
+            logger.error("Error connecting to model API: %s", e)
             raise ModelAPIException(
-                detail=error_message,
+                detail=f"Error connecting to model API: {str(e)}",
                 original_exception=e
             )
 
         except Exception as e:
             # Handle any other unexpected errors
-            error_message = f"Unexpected error communicating with model API: {str(e)}"
-            logger.error(error_message, exc_info=True)
+            logger.error("Unexpected error communicating with model API: %s", e, exc_info=True)
             raise ModelAPIException(
-                detail=error_message,
+                detail=f"Unexpected error communicating with model API: {str(e)}",
                 original_exception=e
             )
@@ -1,17 +1,37 @@
-import json
 import logging
-from typing import AsyncGenerator, Optional, List, Dict, Any
+from typing import AsyncGenerator, AsyncIterator, Optional, List, Dict, Any
 
 import httpx
+import orjson
 
 from localchat.error_handlers import ModelAPIException
 from localchat.models import MessageModel
 from localchat.services.adapters.base_adapter import ModelProviderAdapter
-from localchat.services.interactions.base_strategy import ModelInteractionStrategy
+from localchat.services.interactions.base_strategy import JSON_HEADERS, ModelInteractionStrategy
 
 # Get logger
 logger = logging.getLogger("localchat")
 
+# Server-Sent Events framing used by OpenAI-style and Anthropic streams.
+# Ollama streams bare NDJSON lines, which pass through unchanged.
+SSE_DATA_PREFIX = b"data:"
+SSE_DONE = b"[DONE]"
+SSE_NON_DATA_PREFIXES = (b"event:", b"id:", b"retry:", b":")
+
+
+async def iter_byte_lines(byte_chunks: AsyncIterator[bytes]) -> AsyncGenerator[bytes, None]:
+    """Split a stream of bytes into lines without decoding it to text"""
+    buffer = bytearray()
+    async for data in byte_chunks:
+        buffer += data
+        start = 0
+        while (end := buffer.find(b"\n", start)) != -1:
+            yield bytes(buffer[start:end])
+            start = end + 1
+        del buffer[:start]
+    if buffer:
+        yield bytes(buffer)
+
 
 class StreamingInteractionStrategy(ModelInteractionStrategy):
     """
@@ -65,7 +85,8 @@ class StreamingInteractionStrategy(ModelInteractionStrategy):
             payload["temperature"] = temperature
 
         logger.info(
-            f"Sending streaming request to model API at {formatted_url}",
+            "Sending streaming request to model API at %s",
+            formatted_url,
             extra={
                 "model": model_name,
                 "token_size": token_size,
@@ -75,45 +96,59 @@ class StreamingInteractionStrategy(ModelInteractionStrategy):
 
         try:
             # Send the streaming request to the API
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                async with client.stream("POST", formatted_url, json=payload) as response:
-                    # Check if the request was successful
-                    response.raise_for_status()
+            async with self.http_client.stream(
+                "POST",
+                formatted_url,
+                content=orjson.dumps(payload),
+                headers=JSON_HEADERS
+            ) as response:
+                # Check if the request was successful
+                response.raise_for_status()
+                
+                # Bind the per-chunk adapter hooks once for the whole stream
+                extract_chunk = adapter.extract_streaming_chunk
+                is_final_chunk = adapter.is_final_chunk
+                
+                # Process the streaming response
+                async for chunk in iter_byte_lines(response.aiter_bytes()):
+                    if not chunk or chunk.isspace():
+                        continue
                     
-                    # Process the streaming response
-                    async for chunk in response.aiter_lines():
-                        if not chunk or chunk.isspace():
-                            continue
+                    # Only SSE data lines carry JSON; skip the rest without parsing
+                    if chunk.startswith(SSE_DATA_PREFIX):
+                        chunk = chunk[len(SSE_DATA_PREFIX):].strip()
+                        if chunk == SSE_DONE:
+                            break
+                    elif chunk.startswith(SSE_NON_DATA_PREFIXES):
+                        continue
+                        
+                    try:
+                        # Parse the chunk as JSON
+                        chunk_data = orjson.loads(chunk)
+                        
+                        # Extract the text from the chunk using the adapter
+                        chunk_text = extract_chunk(chunk_data)
+                        
+                        if chunk_text:
+                            yield chunk_text
                             
-                        try:
-                            # Parse the chunk as JSON
-                            chunk_data = json.loads(chunk)
-                            
-                            # Extract the text from the chunk using the adapter
-                            chunk_text = adapter.extract_streaming_chunk(chunk_data)
-                            
-                            if chunk_text:
-                                yield chunk_text
-                                
-                            # Check if this is the final chunk
-                            if adapter.is_final_chunk(chunk_data):
-                                # Log statistics if available
-                                stats = adapter.get_streaming_stats(chunk_data)
-                                if stats:
-                                    logger.info(
-                                        f"Streaming response completed",
-                                        extra={"stats": stats}
-                                    )
-                                break
-                                
-                        except json.JSONDecodeError:
-                            logger.warning(f"Failed to parse streaming chunk as JSON: {chunk[:100]}")
-                            continue
+                        # Check if this is the final chunk
+                        if is_final_chunk(chunk_data):
+                            # Log statistics if available
+                            stats = adapter.get_streaming_stats(chunk_data)
+                            if stats:
+                                logger.info(
+                                    "Streaming response completed",
+                                    extra={"stats": stats}
+                                )
+                            break
                             
+                    except orjson.JSONDecodeError:
+                        logger.warning("Failed to parse streaming chunk as JSON: %s", chunk[:100])
+                        continue
+                        
         except httpx.HTTPStatusError as e:
             # Handle HTTP errors from the model API
-            error_message = f"Model API returned error status: {e.response.status_code}"
-
             try:
                 error_data = e.response.json()
                 error_detail = error_data.get("error", {}).get("message", str(e))
@@ -121,7 +156,8 @@ class StreamingInteractionStrategy(ModelInteractionStrategy):
                 error_detail = e.response.text[:500] if e.response.text else str(e)
 
             logger.error(
-                f"HTTP error from model API: {error_message}",
+                "HTTP error from model API: Model API returned error status: %d",
+                e.response.status_code,
                 extra={
                     "status_code": e.response.status_code,
                     "error_detail": error_detail
@@ -135,18 +171,16 @@ class StreamingInteractionStrategy(ModelInteractionStrategy):
 
         except httpx.RequestError as e:
             # Handle network/connection errors
-            error_message = f"Error connecting to model API: {str(e)}"
-            logger.error(error_message)
+            logger.error("Error connecting to model API: %s", e)
             raise ModelAPIException(
-                detail=error_message,
+                detail=f"Error connecting to model API: {str(e)}",
                 original_exception=e
             )
 
         except Exception as e:
             # Handle any other unexpected errors
-            error_message = f"Unexpected error communicating with model API: {str(e)}"
-            logger.error(error_message, exc_info=True)
+            logger.error("Unexpected error communicating with model API: %s", e, exc_info=True)
             raise ModelAPIException(
-                detail=error_message,
+                detail=f"Unexpected error communicating with model API: {str(e)}",
                 original_exception=e
             )
@@ -1,14 +1,18 @@
 import logging
-import uuid
 import asyncio
-from typing import List, Optional, Dict, Any
+import os
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional, Dict, Any
 
 from fastapi import Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload
 
-from localchat.models import MessageModel, MessageCreate, ChatModel, ProfileModel
+from localchat.models import AsyncSessionLocal, Message, MessageModel, MessageCreate, ChatModel, ProfileModel
 from localchat.utils import get_db_dependency
+from localchat.request_context import request_id_var
 from localchat.exceptions import (
     MessageCreationError,
     MessageFetchError,
@@ -16,41 +20,45 @@ from localchat.exceptions import (
     ProfileNotFoundError,
     DatabaseOperationError
 )
-from localchat.error_handlers import ModelAPIException
-from localchat.services.chat_service import ChatService
-from localchat.services.profile_service import ProfileService
-from localchat.services.model_service import ModelService
+from localchat.error_handlers import ModelAPIException, ModelBusyException
+from localchat.services.model_service import ModelService, get_model_service
 from localchat.services.streaming_service import StreamingService
 
 logger = logging.getLogger("localchat")
 
+# Most recent messages sent to the model as context for a new reply
+MAX_CONTEXT_MESSAGES = int(os.getenv("LOCALCHAT_MAX_CONTEXT_MESSAGES", "50"))
+
+# Rows buffered at a time when streaming a chat's messages as NDJSON
+STREAM_BATCH_SIZE = 200
+
+@lru_cache(maxsize=256)
+def supports_streaming(provider: str, url: str) -> bool:
+    """Whether a profile's provider/URL pair points at an Ollama-style streaming API"""
+    return provider == "ollama" or "ollama" in url.lower() or url.endswith("/api/generate")
+
 class MessageService:
     """Service layer for message operations."""
 
     def __init__(
         self,
-        db: Session = Depends(get_db_dependency),
-        chat_service: ChatService = Depends(ChatService),
-        profile_service: ProfileService = Depends(ProfileService),
-        model_service: ModelService = Depends(ModelService),
+        db: AsyncSession = Depends(get_db_dependency),
+        model_service: ModelService = Depends(get_model_service),
         streaming_service: StreamingService = Depends(StreamingService)
     ):
         """
         Initializes the MessageService with database and service dependencies.
 
         Args:
-            db: The SQLAlchemy Session object injected by FastAPI.
-            chat_service: The ChatService instance injected by FastAPI.
-            profile_service: The ProfileService instance injected by FastAPI.
-            model_service: The ModelService instance injected by FastAPI.
+            db: The SQLAlchemy AsyncSession object injected by FastAPI.
+            model_service: The shared ModelService instance.
+            streaming_service: The StreamingService instance injected by FastAPI.
         """
         self.db = db
-        self.chat_service = chat_service
-        self.profile_service = profile_service
         self.model_service = model_service
         self.streaming_service = streaming_service
 
-    def get_messages(
+    async def get_messages(
         self, 
         chat_id: int, 
         skip: int = 0, 
@@ -74,10 +82,11 @@ class MessageService:
             MessageFetchError: If there's an error fetching messages.
         """
         if request_id is None:
-            request_id = str(uuid.uuid4())
+            request_id = request_id_var.get()
             
         logger.info(
-            f"Fetching messages for chat ID: {chat_id}",
+            "Fetching messages for chat ID: %s",
+            chat_id,
             extra={
                 "request_id": request_id,
                 "chat_id": chat_id,
@@ -87,28 +96,37 @@ class MessageService:
         )
         
         try:
-            # Verify chat exists
-            chat = self.db.query(ChatModel).filter(ChatModel.id == chat_id).first()
-            if not chat:
+            result = await self.db.execute(
+                select(MessageModel)
+                .where(MessageModel.chat_id == chat_id)
+                .order_by(MessageModel.created_at, MessageModel.id)
+                .offset(skip)
+                .limit(limit)
+            )
+            messages = result.scalars().all()
+            
+            # Only an empty page needs to tell a missing chat apart from
+            # one without (more) messages
+            if not messages and await self.db.get(ChatModel, chat_id) is None:
                 logger.warning(
-                    f"Attempted to fetch messages for non-existent chat: {chat_id}",
+                    "Attempted to fetch messages for non-existent chat: %s",
+                    chat_id,
                     extra={"request_id": request_id}
                 )
                 raise ChatNotFoundError(f"Chat with ID {chat_id} not found")
             
-            messages = self.db.query(MessageModel).filter(
-                MessageModel.chat_id == chat_id
-            ).order_by(MessageModel.created_at).offset(skip).limit(limit).all()
-            
             logger.info(
-                f"Successfully fetched {len(messages)} messages for chat ID: {chat_id}",
+                "Successfully fetched %d messages for chat ID: %s",
+                len(messages),
+                chat_id,
                 extra={"request_id": request_id, "count": len(messages)}
             )
             
             return messages
         except SQLAlchemyError as e:
             logger.error(
-                f"Database error fetching messages: {str(e)}",
+                "Database error fetching messages: %s",
+                e,
                 extra={"request_id": request_id},
                 exc_info=True
             )
@@ -117,13 +135,91 @@ class MessageService:
                 original_exception=e
             )
 
+    async def stream_messages(
+        self,
+        chat_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        request_id: str = None
+    ) -> AsyncIterator[MessageModel]:
+        """
+        Streams messages for a specific chat with pagination.
+
+        The chat is checked up front so a missing chat can still be reported
+        before a response starts; the rows themselves are read lazily from a
+        server-side cursor on a dedicated session, since iteration happens
+        while the response is being sent.
+
+        Args:
+            chat_id: The ID of the chat to retrieve messages for.
+            skip: Number of messages to skip.
+            limit: Maximum number of messages to return.
+            request_id: Optional request ID for logging.
+
+        Returns:
+            An async iterator of MessageModel objects.
+
+        Raises:
+            ChatNotFoundError: If the chat with the given ID does not exist.
+            MessageFetchError: If there's an error checking the chat.
+        """
+        if request_id is None:
+            request_id = request_id_var.get()
+            
+        try:
+            chat = await self.db.get(ChatModel, chat_id)
+        except SQLAlchemyError as e:
+            logger.error(
+                "Database error fetching messages: %s",
+                e,
+                extra={"request_id": request_id},
+                exc_info=True
+            )
+            raise MessageFetchError(
+                f"Failed to fetch messages for chat {chat_id} due to database error",
+                original_exception=e
+            )
+        if not chat:
+            logger.warning(
+                "Attempted to fetch messages for non-existent chat: %s",
+                chat_id,
+                extra={"request_id": request_id}
+            )
+            raise ChatNotFoundError(f"Chat with ID {chat_id} not found")
+        
+        statement = (
+            select(MessageModel)
+            .where(MessageModel.chat_id == chat_id)
+            .order_by(MessageModel.created_at, MessageModel.id)
+            .offset(skip)
+            .limit(limit)
+            # Rows are fetched from the cursor in batches of this size
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        return self._iter_messages(statement, request_id)
+
+    async def _iter_messages(self, statement, request_id: str) -> AsyncIterator[MessageModel]:
+        async with AsyncSessionLocal() as session:
+            try:
+                result = await session.stream_scalars(statement)
+                async for message in result:
+                    yield message
+            except SQLAlchemyError as e:
+                # Headers are already sent; all we can do is end the stream
+                logger.error(
+                    "Database error streaming messages: %s",
+                    e,
+                    extra={"request_id": request_id},
+                    exc_info=True
+                )
+
     async def create_message(
         self, 
         chat_id: int, 
         message_data: MessageCreate, 
         stream: bool = False,
         request_id: str = None
-    ) -> MessageModel:
+    ) -> Message:
         """
         Creates a new message in a chat and generates an AI response.
 
@@ -134,7 +230,7 @@ class MessageService:
             request_id: Optional request ID for logging.
 
         Returns:
-            The newly created MessageModel object (AI response).
+            The newly created assistant message (AI response).
 
         Raises:
             ChatNotFoundError: If the chat with the given ID does not exist.
@@ -143,10 +239,11 @@ class MessageService:
             ModelAPIException: If there's an error communicating with the model API.
         """
         if request_id is None:
-            request_id = str(uuid.uuid4())
+            request_id = request_id_var.get()
             
         logger.info(
-            f"Creating new message in chat ID: {chat_id}",
+            "Creating new message in chat ID: %s",
+            chat_id,
             extra={
                 "request_id": request_id,
                 "chat_id": chat_id,
@@ -157,34 +254,22 @@ class MessageService:
         )
         
         try:
-            # Verify that the chat exists
-            chat = self.db.query(ChatModel).filter(ChatModel.id == chat_id).first()
+            # Load the chat together with its profile
+            chat = await self.db.get(ChatModel, chat_id, options=[joinedload(ChatModel.profile)])
             if not chat:
                 logger.warning(
-                    f"Attempted to create message in non-existent chat: {chat_id}",
+                    "Attempted to create message in non-existent chat: %s",
+                    chat_id,
                     extra={"request_id": request_id}
                 )
                 raise ChatNotFoundError(f"Chat with ID {chat_id} not found")
             
-            # Save user message
-            db_message = MessageModel(**message_data.dict(), chat_id=chat_id)
-            self.db.add(db_message)
-            self.db.commit()
-            self.db.refresh(db_message)
-            
-            logger.info(
-                f"Saved user message (ID: {db_message.id}) in chat {chat_id}",
-                extra={
-                    "request_id": request_id,
-                    "message_id": db_message.id
-                }
-            )
-            
-            # Get profile information
-            profile = self.db.query(ProfileModel).filter(ProfileModel.id == chat.profile_id).first()
+            profile = chat.profile
             if not profile:
                 logger.error(
-                    f"Profile not found for chat {chat_id} (profile_id: {chat.profile_id})",
+                    "Profile not found for chat %s (profile_id: %s)",
+                    chat_id,
+                    chat.profile_id,
                     extra={
                         "request_id": request_id,
                         "chat_id": chat_id,
@@ -193,13 +278,28 @@ class MessageService:
                 )
                 raise ProfileNotFoundError(f"Profile with ID {chat.profile_id} not found for this chat")
             
-            # Get previous messages for context
-            previous_messages = self.db.query(MessageModel).filter(
-                MessageModel.chat_id == chat_id
-            ).order_by(MessageModel.created_at).all()
+            # Latest stored messages for context, fetched newest first so the
+            # limit applies, then put back in order
+            result = await self.db.execute(
+                select(MessageModel)
+                .where(MessageModel.chat_id == chat_id)
+                .order_by(MessageModel.created_at.desc(), MessageModel.id.desc())
+                .limit(max(MAX_CONTEXT_MESSAGES - 1, 0))
+            )
+            history = result.scalars().all()[::-1]
+            # End the read transaction so the connection goes back to the pool
+            # while the model is working; the loaded rows stay usable
+            await self.db.commit()
+            
+            # The user message is committed together with the reply, or on its
+            # own when the model fails or before a stream starts
+            db_message = MessageModel(**message_data.model_dump(), chat_id=chat_id)
+            self.db.add(db_message)
+            previous_messages = [*history, db_message]
             
             logger.info(
-                f"Sending request to model API for chat {chat_id}",
+                "Sending request to model API for chat %s",
+                chat_id,
                 extra={
                     "request_id": request_id,
                     "profile_name": profile.name,
@@ -210,13 +310,18 @@ class MessageService:
                 }
             )
             
-            # Check if this is an Ollama provider or API URL for streaming
-            is_ollama_api = (profile.provider == "ollama" or 
-                            "ollama" in profile.url.lower() or 
-                            profile.url.endswith("/api/generate"))
-            
-            # Handle streaming response if requested and supported
-            if stream and is_ollama_api:
+            # Stream only for Ollama providers or Ollama-style API URLs
+            if stream and supports_streaming(profile.provider, profile.url):
+                await self.db.commit()
+                logger.info(
+                    "Saved user message (ID: %s) in chat %s",
+                    db_message.id,
+                    chat_id,
+                    extra={
+                        "request_id": request_id,
+                        "message_id": db_message.id
+                    }
+                )
                 return await self._handle_streaming_response(
                     chat_id=chat_id,
                     profile=profile,
@@ -225,20 +330,35 @@ class MessageService:
                 )
             
             # Get response from the model (non-streaming)
-            return await self._handle_non_streaming_response(
-                chat_id=chat_id,
-                profile=profile,
-                previous_messages=previous_messages,
-                request_id=request_id
-            )
+            try:
+                return await self._handle_non_streaming_response(
+                    chat_id=chat_id,
+                    profile=profile,
+                    previous_messages=previous_messages,
+                    request_id=request_id
+                )
+            except ModelAPIException:
+                # No reply to save, but the user's message is kept
+                await self.db.commit()
+                logger.info(
+                    "Saved user message (ID: %s) in chat %s without a reply",
+                    db_message.id,
+                    chat_id,
+                    extra={
+                        "request_id": request_id,
+                        "message_id": db_message.id
+                    }
+                )
+                raise
                 
         except (ChatNotFoundError, ProfileNotFoundError, ModelAPIException):
             # These exceptions are already properly formatted, just re-raise them
             raise
         except SQLAlchemyError as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error(
-                f"Database error processing message: {str(e)}",
+                "Database error processing message: %s",
+                e,
                 extra={"request_id": request_id},
                 exc_info=True
             )
@@ -286,9 +406,13 @@ class MessageService:
                 profile=profile,
                 request_id=request_id
             )
+        except ModelBusyException:
+            # Falling back would only wait for a generation slot again
+            raise
         except Exception as e:
             logger.error(
-                f"Error setting up streaming response: {str(e)}",
+                "Error setting up streaming response: %s",
+                e,
                 extra={"request_id": request_id},
                 exc_info=True
             )
@@ -306,7 +430,7 @@ class MessageService:
         profile: ProfileModel,
         previous_messages: List[MessageModel],
         request_id: str
-    ) -> MessageModel:
+    ) -> Message:
         """
         Handle non-streaming response from the model API.
         
@@ -317,7 +441,7 @@ class MessageService:
             request_id: Request ID for logging.
             
         Returns:
-            The newly created assistant MessageModel object.
+            The newly created assistant message.
             
         Raises:
             ModelAPIException: If there's an error communicating with the model API.
@@ -333,7 +457,7 @@ class MessageService:
             )
             
             # Create assistant message
-            return self.create_assistant_message(chat_id, response_text, request_id)
+            return await self.create_assistant_message(chat_id, response_text, request_id)
             
         except ModelAPIException:
             # This exception already has detailed error info and has been logged
@@ -353,12 +477,12 @@ class MessageService:
                 original_exception=e
             )
 
-    def create_assistant_message(
+    async def create_assistant_message(
         self, 
         chat_id: int, 
         content: str,
         request_id: str = None
-    ) -> MessageModel:
+    ) -> Message:
         """
         Creates a new assistant message in a chat.
 
@@ -368,27 +492,40 @@ class MessageService:
             request_id: Optional request ID for logging.
 
         Returns:
-            The newly created MessageModel object.
+            The newly created message.
 
         Raises:
             MessageCreationError: If the message cannot be created due to a database error.
         """
         if request_id is None:
-            request_id = str(uuid.uuid4())
+            request_id = request_id_var.get()
             
         try:
-            # Create and save assistant message
-            assistant_message = MessageModel(
+            # Write the user message still pending in this session first, so
+            # it keeps the lower id; both rows are committed together below
+            await self.db.flush()
+            
+            # Plain INSERT ... RETURNING; the reply needs no ORM bookkeeping
+            result = await self.db.execute(
+                insert(MessageModel)
+                .values(chat_id=chat_id, role="assistant", content=content)
+                .returning(MessageModel.id, MessageModel.created_at)
+            )
+            row = result.one()
+            await self.db.commit()
+            
+            assistant_message = Message.model_construct(
+                id=row.id,
                 chat_id=chat_id,
                 role="assistant",
-                content=content
+                content=content,
+                created_at=row.created_at
             )
-            self.db.add(assistant_message)
-            self.db.commit()
-            self.db.refresh(assistant_message)
             
             logger.info(
-                f"Saved assistant response (ID: {assistant_message.id}) in chat {chat_id}",
+                "Saved assistant response (ID: %s) in chat %s",
+                assistant_message.id,
+                chat_id,
                 extra={
                     "request_id": request_id,
                     "message_id": assistant_message.id,
@@ -398,9 +535,10 @@ class MessageService:
             
             return assistant_message
         except SQLAlchemyError as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error(
-                f"Database error creating assistant message: {str(e)}",
+                "Database error creating assistant message: %s",
+                e,
                 extra={"request_id": request_id},
                 exc_info=True
             )
@@ -1,11 +1,12 @@
 import logging
+from functools import lru_cache
 from typing import List, Optional, AsyncGenerator
 
 from fastapi import Depends
 
 from ..error_handlers import ModelAPIException
 from ..models import MessageModel
-from ..services.interactions.interaction_service import ModelInteractionService
+from ..services.interactions.interaction_service import ModelInteractionService, get_interaction_service
 
 logger = logging.getLogger("localchat")
 
@@ -18,7 +19,7 @@ class ModelService:
 
     def __init__(
         self,
-        interaction_service: ModelInteractionService = Depends(ModelInteractionService)
+        interaction_service: ModelInteractionService = Depends(get_interaction_service)
     ):
         """
         Initialize the ModelService with dependencies.
@@ -70,10 +71,9 @@ class ModelService:
                 raise
                 
             # Otherwise, wrap it in a ModelAPIException
-            error_message = f"Error getting model response: {str(e)}"
-            logger.error(error_message, exc_info=True)
+            logger.error("Error getting model response: %s", e, exc_info=True)
             raise ModelAPIException(
-                detail=error_message,
+                detail=f"Error getting model response: {str(e)}",
                 original_exception=e
             )
             
@@ -123,9 +123,19 @@ class ModelService:
                 raise
                 
             # Otherwise, wrap it in a ModelAPIException
-            error_message = f"Error streaming model response: {str(e)}"
-            logger.error(error_message, exc_info=True)
+            logger.error("Error streaming model response: %s", e, exc_info=True)
             raise ModelAPIException(
-                detail=error_message,
+                detail=f"Error streaming model response: {str(e)}",
                 original_exception=e
             )
+
+
+@lru_cache(maxsize=None)
+def get_model_service() -> ModelService:
+    """
+    Dependency provider for a shared ModelService.
+
+    ModelService only wraps the shared interaction service, so a single
+    instance serves every request.
+    """
+    return ModelService(interaction_service=get_interaction_service())
@@ -2,11 +2,13 @@ import logging
 from typing import List
 
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import selectinload
 
 # Import the actual SQLAlchemy model, not the Pydantic schema
-from localchat.models import ProfileModel, ProfileCreate
+from localchat.models import ChatModel, ProfileModel, ProfileCreate
 from localchat.utils import get_db_dependency
 from localchat.exceptions import (
     ProfileNotFoundError,
@@ -26,10 +28,10 @@ class ProfileService:
     """
     Service for profile (model/user config) CRUD and validation.
     """
-    def __init__(self, db: Session = Depends(get_db_dependency)):
+    def __init__(self, db: AsyncSession = Depends(get_db_dependency)):
         self.db = db
 
-    def create_profile(self, profile_data: ProfileCreate) -> ProfileModel:
+    async def create_profile(self, profile_data: ProfileCreate) -> ProfileModel:
         """
         Creates a new profile.
 
@@ -42,20 +44,20 @@ class ProfileService:
         Raises:
             ProfileCreationError: If the profile cannot be created due to a database error.
         """
-        logger.info(f"Attempting to create profile: {profile_data.name}")
-        db_profile = ProfileModel(**profile_data.dict())
+        logger.info("Attempting to create profile: %s", profile_data.name)
+        db_profile = ProfileModel(**profile_data.model_dump())
         try:
             self.db.add(db_profile)
-            self.db.commit()
-            self.db.refresh(db_profile)
-            logger.info(f"Successfully created profile: {db_profile.name} (ID: {db_profile.id})")
+            await self.db.commit()
+            await self.db.refresh(db_profile)
+            logger.info("Successfully created profile: %s (ID: %s)", db_profile.name, db_profile.id)
             return db_profile
         except SQLAlchemyError as e:
-            self.db.rollback()
-            logger.error(f"Database error creating profile '{profile_data.name}': {e}", exc_info=True)
+            await self.db.rollback()
+            logger.error("Database error creating profile '%s': %s", profile_data.name, e, exc_info=True)
             raise ProfileCreationError(f"Database error creating profile '{profile_data.name}'", original_exception=e)
 
-    def get_profile(self, profile_id: int) -> ProfileModel:
+    async def get_profile(self, profile_id: int) -> ProfileModel:
         """
         Retrieves a single profile by its ID.
 
@@ -69,19 +71,20 @@ class ProfileService:
             ProfileNotFoundError: If the profile with the given ID does not exist.
             DatabaseOperationError: If a database error occurs during retrieval.
         """
-        logger.debug(f"Attempting to retrieve profile with id: {profile_id}")
+        logger.debug("Attempting to retrieve profile with id: %s", profile_id)
         try:
-            profile = self.db.query(ProfileModel).filter(ProfileModel.id == profile_id).first()
+            # Served from the session's identity map if already loaded in this request
+            profile = await self.db.get(ProfileModel, profile_id)
             if not profile:
-                logger.warning(f"Profile not found with id: {profile_id}")
+                logger.warning("Profile not found with id: %s", profile_id)
                 raise ProfileNotFoundError(f"Profile with id {profile_id} not found")
-            logger.debug(f"Successfully retrieved profile: {profile.name} (ID: {profile_id})")
+            logger.debug("Successfully retrieved profile: %s (ID: %s)", profile.name, profile_id)
             return profile
         except SQLAlchemyError as e:
-            logger.error(f"Database error retrieving profile {profile_id}: {e}", exc_info=True)
+            logger.error("Database error retrieving profile %s: %s", profile_id, e, exc_info=True)
             raise DatabaseOperationError(f"Database error retrieving profile {profile_id}", original_exception=e)
 
-    def get_profiles(self, skip: int = 0, limit: int = 100) -> List[ProfileModel]:
+    async def get_profiles(self, skip: int = 0, limit: int = 100) -> List[ProfileModel]:
         """
         Retrieves a list of profiles with pagination.
 
@@ -95,16 +98,17 @@ class ProfileService:
         Raises:
             DatabaseOperationError: If a database error occurs during retrieval.
         """
-        logger.debug(f"Attempting to retrieve profiles (skip={skip}, limit={limit})")
+        logger.debug("Attempting to retrieve profiles (skip=%s, limit=%s)", skip, limit)
         try:
-            profiles = self.db.query(ProfileModel).offset(skip).limit(limit).all()
-            logger.debug(f"Successfully retrieved {len(profiles)} profiles")
+            result = await self.db.execute(select(ProfileModel).offset(skip).limit(limit))
+            profiles = result.scalars().all()
+            logger.debug("Successfully retrieved %d profiles", len(profiles))
             return profiles
         except SQLAlchemyError as e:
-            logger.error(f"Database error retrieving profiles: {e}", exc_info=True)
+            logger.error("Database error retrieving profiles: %s", e, exc_info=True)
             raise DatabaseOperationError("Database error retrieving profiles", original_exception=e)
 
-    def update_profile(self, profile_id: int, profile_data: ProfileCreate) -> ProfileModel:
+    async def update_profile(self, profile_id: int, profile_data: ProfileCreate) -> ProfileModel:
         """
         Updates an existing profile.
 
@@ -119,25 +123,32 @@ class ProfileService:
             ProfileNotFoundError: If the profile with the given ID does not exist.
             ProfileUpdateError: If the profile cannot be updated due to a database error.
         """
-        logger.info(f"Attempting to update profile with id: {profile_id}")
-        db_profile = self.get_profile(profile_id)  # This will raise ProfileNotFoundError if not found
-
-        update_data = profile_data.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_profile, key, value)
+        logger.info("Attempting to update profile with id: %s", profile_id)
+        update_data = profile_data.model_dump(exclude_unset=True)
+        if not update_data:
+            return await self.get_profile(profile_id)  # This will raise ProfileNotFoundError if not found
 
         try:
-            self.db.add(db_profile)
-            self.db.commit()
-            self.db.refresh(db_profile)
-            logger.info(f"Successfully updated profile: {db_profile.name} (ID: {profile_id})")
+            # Single UPDATE ... RETURNING instead of loading the row and setting each field
+            result = await self.db.execute(
+                update(ProfileModel)
+                .where(ProfileModel.id == profile_id)
+                .values(**update_data)
+                .returning(ProfileModel)
+            )
+            db_profile = result.scalars().first()
+            if db_profile is None:
+                logger.warning("Profile not found with id: %s", profile_id)
+                raise ProfileNotFoundError(f"Profile with id {profile_id} not found")
+            await self.db.commit()
+            logger.info("Successfully updated profile: %s (ID: %s)", db_profile.name, profile_id)
             return db_profile
         except SQLAlchemyError as e:
-            self.db.rollback()
-            logger.error(f"Database error updating profile {profile_id}: {e}", exc_info=True)
+            await self.db.rollback()
+            logger.error("Database error updating profile %s: %s", profile_id, e, exc_info=True)
             raise ProfileUpdateError(f"Database error updating profile {profile_id}", original_exception=e)
 
-    def delete_profile(self, profile_id: int) -> None:
+    async def delete_profile(self, profile_id: int) -> None:
         """
         Deletes a profile.
 
@@ -148,14 +159,21 @@ class ProfileService:
             ProfileNotFoundError: If the profile with the given ID does not exist.
             ProfileDeletionError: If the profile cannot be deleted due to a database error.
         """
-        logger.info(f"Attempting to delete profile with id: {profile_id}")
-        db_profile = self.get_profile(profile_id)  # This will raise ProfileNotFoundError if not found
+        logger.info("Attempting to delete profile with id: %s", profile_id)
+        db_profile = await self.get_profile(profile_id)  # This will raise ProfileNotFoundError if not found
 
         try:
-            self.db.delete(db_profile)
-            self.db.commit()
-            logger.info(f"Successfully deleted profile: {db_profile.name} (ID: {profile_id})")
+            # The delete cascades to chats and their messages; load them up
+            # front since async sessions can't lazy-load during the flush
+            await self.db.execute(
+                select(ProfileModel)
+                .options(selectinload(ProfileModel.chats).selectinload(ChatModel.messages))
+                .where(ProfileModel.id == profile_id)
+            )
+            await self.db.delete(db_profile)
+            await self.db.commit()
+            logger.info("Successfully deleted profile: %s (ID: %s)", db_profile.name, profile_id)
         except SQLAlchemyError as e:
-            self.db.rollback()
-            logger.error(f"Database error deleting profile {profile_id}: {e}", exc_info=True)
+            await self.db.rollback()
+            logger.error("Database error deleting profile %s: %s", profile_id, e, exc_info=True)
             raise ProfileDeletionError(f"Database error deleting profile {profile_id}", original_exception=e)
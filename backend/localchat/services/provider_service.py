@@ -1,7 +1,11 @@
 import logging
-from typing import List, Dict, Any, Optional
+import os
+import time
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 
 import httpx
+import orjson
 from fastapi import Depends
 
 from localchat.exceptions import (
@@ -10,32 +14,153 @@ from localchat.exceptions import (
     ProfileNotFoundError,
     DatabaseOperationError
 )
+from localchat.http_client import get_http_client
 from localchat.services.profile_service import ProfileService
 
 logger = logging.getLogger(__name__)
 
-# Define Base URL mapping (can be moved to config later)
-PROVIDER_BASE_URLS = {
-    "ollama": "/api/tags",
-    # Add other providers if needed
-}
+# Model lists rarely change, so keep them for a short while per listing URL
+MODEL_LIST_CACHE_TTL = float(os.getenv("LOCALCHAT_MODEL_LIST_CACHE_TTL", "60"))
+MODEL_LIST_CACHE_MAX_ENTRIES = 32
+
+
+class ModelListClient:
+    """Fetches and caches the model list of a single provider."""
+
+    def __init__(
+        self,
+        provider: str,
+        endpoint_path: str,
+        http_client: Optional[httpx.AsyncClient] = None,
+        default_base_url: Optional[str] = None,
+        strip_suffixes: Tuple[str, ...] = ()
+    ):
+        """
+        Initializes the client for one provider.
+
+        Args:
+            provider: The name of the provider (e.g., 'ollama').
+            endpoint_path: Path of the model listing endpoint, appended to the base URL.
+            http_client: Client used for provider calls; defaults to the shared client.
+            default_base_url: Base URL to use when none is configured, if any.
+            strip_suffixes: Endpoint suffixes users commonly paste into the base URL.
+        """
+        self.provider = provider
+        self.endpoint_path = endpoint_path
+        self._http_client = http_client
+        self.default_base_url = default_base_url
+        self.strip_suffixes = strip_suffixes
+        self._cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """The client for provider calls, looked up per call so a shared client
+        rebuilt after shutdown is picked up."""
+        return self._http_client or get_http_client()
+
+    def listing_url(self, base_url: str) -> str:
+        """Builds the model listing URL from a configured base URL."""
+        base_url = base_url.removesuffix("/")
+        for suffix in self.strip_suffixes:
+            base_url = base_url.removesuffix(suffix)
+        return f"{base_url}{self.endpoint_path}"
+
+    async def list_models(self, base_url: str, use_cache: bool = True) -> List[Dict[str, Any]]:
+        """
+        Lists the models available at the given base URL.
+
+        Args:
+            base_url: The provider base URL.
+            use_cache: Whether a recently fetched model list may be returned.
+
+        Returns:
+            A list of dictionaries, each representing a model.
+
+        Raises:
+            ProviderConfigurationError: If the listing endpoint rejects the configuration.
+            ModelInteractionError: If communication with the provider fails.
+        """
+        url = self.listing_url(base_url)
+        if use_cache:
+            cached = self._cache.get(url)
+            if cached is not None and time.monotonic() - cached[0] < MODEL_LIST_CACHE_TTL:
+                logger.debug("Returning cached model list for %s", url)
+                return cached[1]
+
+        logger.debug("Requesting models from URL: %s", url)
+
+        provider = self.provider
+        try:
+            response = await self.http_client.get(url)
+            response.raise_for_status()
+            models = orjson.loads(response.content).get("models", [])
+        except httpx.RequestError as e:
+            logger.error("HTTP request error listing models from %s: %s", url, e, exc_info=True)
+            raise ModelInteractionError(f"Error communicating with provider {provider} at {url}", original_exception=e)
+        except httpx.HTTPStatusError as e:
+            logger.error("HTTP status error %d listing models from %s: %s", e.response.status_code, url, e.response.text, exc_info=True)
+            status = e.response.status_code
+            if status == 404:
+                raise ProviderConfigurationError(f"Model listing endpoint not found at {url} (404). Check base URL.", original_exception=e)
+            elif status == 401:
+                raise ProviderConfigurationError(f"Authentication failed for provider {provider} at {url} (401). Check API key.", original_exception=e)
+            else:
+                raise ModelInteractionError(f"Provider {provider} returned error {status} when listing models at {url}", original_exception=e)
+        except Exception as e:
+            logger.error("Unexpected error listing models from %s: %s", url, e, exc_info=True)
+            raise ModelInteractionError(f"Unexpected error processing response from {provider} at {url}", original_exception=e)
+
+        if len(self._cache) >= MODEL_LIST_CACHE_MAX_ENTRIES and url not in self._cache:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[url] = (time.monotonic(), models)
+        logger.info("Successfully listed %d models from %s at %s", len(models), provider, base_url)
+        return models
+
+
+@lru_cache(maxsize=None)
+def get_provider_registry() -> Dict[str, ModelListClient]:
+    """
+    Dependency provider for the shared model listing clients.
+
+    The clients hold the model list cache, so they are built once per process
+    rather than per request; requests go through the shared HTTP client.
+    """
+    return {
+        "ollama": ModelListClient(
+            "ollama",
+            "/api/tags",
+            default_base_url="http://localhost:11434",
+            strip_suffixes=("/api/generate",)
+        ),
+        # Add other providers if needed
+    }
+
 
 class ProviderService:
     """Service layer for interacting with model providers (e.g., listing models)."""
 
     def __init__(
         self,
-        profile_service: ProfileService = Depends(ProfileService)
+        profile_service: ProfileService = Depends(ProfileService),
+        registry: Dict[str, ModelListClient] = Depends(get_provider_registry)
     ):
         """
-        Initializes the ProviderService with a profile service dependency.
+        Initializes the ProviderService with profile service and provider registry dependencies.
 
         Args:
             profile_service: The ProfileService instance injected by FastAPI.
+            registry: The shared model listing clients, keyed by provider name.
         """
         self.profile_service = profile_service
+        self.registry = registry
 
-    async def list_models(self, provider: str, profile_id: Optional[int] = None, base_url_override: Optional[str] = None) -> List[Dict[str, Any]]:
+    async def list_models(
+        self,
+        provider: str,
+        profile_id: Optional[int] = None,
+        base_url_override: Optional[str] = None,
+        use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
         """
         Lists available models from a specified provider.
 
@@ -43,6 +168,8 @@ class ProviderService:
             provider: The name of the provider (e.g., 'ollama').
             profile_id: Optional ID of the profile to use for provider config (e.g., base URL).
             base_url_override: Optional explicit base URL to use, bypassing profile lookup.
+            use_cache: Whether a recently fetched model list may be returned. A fresh
+                result is always stored in the cache.
 
         Returns:
             A list of dictionaries, each representing a model.
@@ -51,77 +178,34 @@ class ProviderService:
             ProviderConfigurationError: If the provider is unsupported or config is missing/invalid.
             ModelInteractionError: If communication with the provider fails.
         """
-        logger.info(f"Attempting to list models for provider: {provider}")
+        logger.info("Attempting to list models for provider: %s", provider)
+
+        client = self.registry.get(provider.lower())
+        if client is None:
+            logger.error("Unsupported provider specified: %s", provider)
+            raise ProviderConfigurationError(f"Unsupported provider: {provider}", is_client_error=True)
 
         # Determine the base URL to use
         if base_url_override:
             base_url = base_url_override
-            logger.debug(f"Using provided base URL override: {base_url}")
+            logger.debug("Using provided base URL override: %s", base_url)
         elif profile_id is not None:
             try:
-                profile = self.profile_service.get_profile(profile_id)
+                profile = await self.profile_service.get_profile(profile_id)
                 # Assuming profile model has ollama_base_url, openai_api_key etc.
                 base_url = getattr(profile, f"{provider}_base_url", None)
                 if not base_url:
-                    logger.error(f"Base URL for provider '{provider}' not found in profile {profile_id}")
+                    logger.error("Base URL for provider '%s' not found in profile %s", provider, profile_id)
                     raise ProviderConfigurationError(f"Base URL for provider '{provider}' not configured in profile {profile_id}")
-                logger.debug(f"Using base URL from profile {profile_id}: {base_url}")
+                logger.debug("Using base URL from profile %s: %s", profile_id, base_url)
             except (ProfileNotFoundError, DatabaseOperationError) as e:
-                logger.error(f"Error fetching profile {profile_id} to get base URL for provider {provider}: {e}")
+                logger.error("Error fetching profile %s to get base URL for provider %s: %s", profile_id, provider, e)
                 raise ProviderConfigurationError(f"Could not retrieve configuration for provider '{provider}' from profile {profile_id}") from e
+        elif client.default_base_url:
+            base_url = client.default_base_url
+            logger.debug("Using default base URL for %s: %s", provider, base_url)
         else:
-            # Default fallback for Ollama only
-            if provider.lower() == "ollama":
-                base_url = "http://localhost:11434"
-                logger.debug(f"Using default base URL for Ollama: {base_url}")
-            else:
-                logger.error(f"Cannot list models for '{provider}': Profile ID or base_url_override required.")
-                raise ProviderConfigurationError(f"Configuration missing for provider '{provider}'. Provide profile_id or base_url_override.", is_client_error=True)
-
-        # Validate provider and construct URL
-        endpoint_path = PROVIDER_BASE_URLS.get(provider.lower())
-        if not endpoint_path:
-            logger.error(f"Unsupported provider specified: {provider}")
-            raise ProviderConfigurationError(f"Unsupported provider: {provider}", is_client_error=True)
-
-        # Clean up base URL
-        if base_url.endswith("/"):
-            base_url = base_url[:-1]
-        if provider.lower() == "ollama" and base_url.endswith('/api/generate'):
-            base_url = base_url.replace('/api/generate', '')
+            logger.error("Cannot list models for '%s': Profile ID or base_url_override required.", provider)
+            raise ProviderConfigurationError(f"Configuration missing for provider '{provider}'. Provide profile_id or base_url_override.", is_client_error=True)
 
-        # Construct full URL
-        url = f"{base_url}{endpoint_path}"
-        logger.debug(f"Requesting models from URL: {url}")
-
-        # Make the API request
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-
-                # Parse response based on provider
-                if provider.lower() == "ollama":
-                    models = data.get("models", [])
-                    logger.info(f"Successfully listed {len(models)} models from Ollama at {base_url}")
-                    return models
-                else:
-                    logger.error(f"Parsing logic not implemented for provider: {provider}")
-                    raise ProviderConfigurationError(f"Parsing not implemented for provider: {provider}")
-
-        except httpx.RequestError as e:
-            logger.error(f"HTTP request error listing models from {url}: {e}", exc_info=True)
-            raise ModelInteractionError(f"Error communicating with provider {provider} at {url}", original_exception=e)
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP status error {e.response.status_code} listing models from {url}: {e.response.text}", exc_info=True)
-            status = e.response.status_code
-            if status == 404:
-                raise ProviderConfigurationError(f"Model listing endpoint not found at {url} (404). Check base URL.", original_exception=e)
-            elif status == 401:
-                raise ProviderConfigurationError(f"Authentication failed for provider {provider} at {url} (401). Check API key.", original_exception=e)
-            else:
-                raise ModelInteractionError(f"Provider {provider} returned error {status} when listing models at {url}", original_exception=e)
-        except Exception as e:
-            logger.error(f"Unexpected error listing models from {url}: {e}", exc_info=True)
-            raise ModelInteractionError(f"Unexpected error processing response from {provider} at {url}", original_exception=e)
+        return await client.list_models(base_url, use_cache)
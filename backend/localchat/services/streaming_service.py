@@ -1,53 +1,44 @@
-from typing import Dict, Any, AsyncGenerator, List, Optional
-import logging
-import json
+from typing import AsyncGenerator, List, Optional
 import asyncio
-import uuid
-from fastapi import Depends, HTTPException
+import logging
+import time
+from fastapi import Depends
 from fastapi.responses import StreamingResponse
-import httpx
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
+from starlette.background import BackgroundTask
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from localchat.models import MessageModel, ProfileModel
 from localchat.error_handlers import ModelAPIException
 from localchat.utils import get_db_dependency
-from localchat.exceptions import (
-    MessageCreationError,
-    DatabaseOperationError,
-    ChatNotFoundError,
-    ProfileNotFoundError
-)
-from localchat.services.chat_service import ChatService
-from localchat.services.profile_service import ProfileService
-from localchat.services.interactions.interaction_service import ModelInteractionService
-from localchat.models import SessionLocal
+from localchat.request_context import request_id_var
+from localchat.services.interactions.interaction_service import ModelInteractionService, get_interaction_service
+from localchat.models import AsyncSessionLocal
 
 # Get logger
 logger = logging.getLogger("localchat")
 
+# Model chunks are coalesced into one SSE event until this many characters
+# are buffered or this many seconds have passed since the last event
+STREAM_FLUSH_CHARS = 512
+STREAM_FLUSH_INTERVAL = 0.03
+
 class StreamingService:
     """Service layer for streaming operations."""
 
     def __init__(
         self,
-        db: Session = Depends(get_db_dependency),
-        chat_service: ChatService = Depends(ChatService),
-        profile_service: ProfileService = Depends(ProfileService),
-        interaction_service: ModelInteractionService = Depends(ModelInteractionService)
+        db: AsyncSession = Depends(get_db_dependency),
+        interaction_service: ModelInteractionService = Depends(get_interaction_service)
     ):
         """
         Initializes the StreamingService with database and service dependencies.
 
         Args:
-            db: The SQLAlchemy Session object injected by FastAPI.
-            chat_service: The ChatService instance injected by FastAPI.
-            profile_service: The ProfileService instance injected by FastAPI.
-            interaction_service: The ModelInteractionService instance injected by FastAPI.
+            db: The SQLAlchemy AsyncSession object injected by FastAPI.
+            interaction_service: The shared ModelInteractionService instance.
         """
         self.db = db
-        self.chat_service = chat_service
-        self.profile_service = profile_service
         self.interaction_service = interaction_service
 
     async def create_streaming_response_for_chat(
@@ -71,70 +62,53 @@ class StreamingService:
 
         Raises:
             ModelAPIException: If there's an error communicating with the model API.
-            MessageCreationError: If there's an error creating the message.
         """
         if request_id is None:
-            request_id = str(uuid.uuid4())
+            request_id = request_id_var.get()
 
         try:
-            # Create a new empty message to be filled with the streamed content
-            assistant_message = MessageModel(
-                chat_id=chat_id,
-                role="assistant",
-                content=""  # Will be filled after streaming completes
-            )
-            self.db.add(assistant_message)
-            self.db.commit()
-            self.db.refresh(assistant_message)
-            
-            logger.info(
-                f"Created empty assistant message (ID: {assistant_message.id}) for streaming in chat {chat_id}",
-                extra={
-                    "request_id": request_id,
-                    "message_id": assistant_message.id,
-                    "streaming": True
-                }
-            )
+            # Keep a copy of every chunk sent to the client so the same
+            # generation can be saved afterwards, without a second model call
+            chunks: List[str] = []
             
-            # Create a generator for the streaming response
-            response_generator = self.stream_model_response(
+            # Wait for the model to start answering before the response does,
+            # so a busy or failing model gets a proper error status instead of
+            # a stream that breaks after the headers were sent
+            model_stream = await self._start_stream(self.stream_model_response(
                 url=profile.url,
                 model_name=profile.model_name,
                 messages=messages,
                 token_size=profile.token_size,
                 provider=profile.provider or "ollama"
+            ))
+            
+            logger.info(
+                "Starting streamed response in chat %s",
+                chat_id,
+                extra={
+                    "request_id": request_id,
+                    "chat_id": chat_id,
+                    "streaming": True
+                }
             )
             
-            # Create a background task to save the complete response
-            asyncio.create_task(
-                self._save_streaming_response(
-                    message_id=assistant_message.id,
-                    url=profile.url,
-                    model_name=profile.model_name,
-                    messages=messages,
-                    token_size=profile.token_size,
-                    provider=profile.provider or "custom",
+            # Return the streaming response; the reply is saved once it ends
+            return self.create_streaming_response(
+                self._coalesce_chunks(model_stream, chunks),
+                background=BackgroundTask(
+                    self._save_streamed_response,
+                    chat_id=chat_id,
+                    chunks=chunks,
                     request_id=request_id
                 )
             )
             
-            # Return the streaming response
-            return self.create_streaming_response(response_generator)
-            
-        except SQLAlchemyError as e:
-            self.db.rollback()
-            logger.error(
-                f"Database error creating streaming message: {str(e)}",
-                extra={"request_id": request_id},
-                exc_info=True
-            )
-            raise MessageCreationError(
-                "Failed to create streaming message due to database error",
-                original_exception=e
-            )
+        except ModelAPIException:
+            raise
         except Exception as e:
             logger.error(
-                f"Error setting up streaming response: {str(e)}",
+                "Error setting up streaming response: %s",
+                e,
                 extra={"request_id": request_id},
                 exc_info=True
             )
@@ -143,89 +117,149 @@ class StreamingService:
                 original_exception=e
             )
 
-    async def _save_streaming_response(
+    @staticmethod
+    async def _start_stream(stream: AsyncGenerator[str, None]) -> AsyncGenerator[str, None]:
+        """
+        Wait for the first chunk of a stream so that errors raised while it
+        starts propagate to the caller.
+
+        Args:
+            stream: The chunk stream to start.
+
+        Returns:
+            A stream yielding the same chunks, the first one included.
+        """
+        try:
+            first_chunk = await stream.__anext__()
+        except StopAsyncIteration:
+            first_chunk = None
+
+        async def resumed() -> AsyncGenerator[str, None]:
+            if first_chunk is None:
+                return
+            yield first_chunk
+            async for chunk in stream:
+                yield chunk
+
+        return resumed()
+
+    @staticmethod
+    async def _coalesce_chunks(
+        stream: AsyncGenerator[str, None],
+        chunks: List[str]
+    ) -> AsyncGenerator[str, None]:
+        """
+        Merge model chunks into fewer, larger events.
+
+        Buffered text is sent once STREAM_FLUSH_CHARS characters have built up
+        or STREAM_FLUSH_INTERVAL seconds have passed since the last event,
+        whichever comes first; the interval is enforced with a timer, so text
+        is not held back while the model stalls.
+
+        Args:
+            stream: The model's chunk stream.
+            chunks: List every chunk is appended to as it arrives.
+
+        Yields:
+            The coalesced text.
+        """
+        pending: List[str] = []
+        pending_chars = 0
+        # Zero so the first chunk goes out as soon as it arrives
+        last_flush = 0.0
+        # Each chunk is awaited as a task so that waiting on it can time out
+        # without cancelling the model stream
+        next_chunk = asyncio.ensure_future(stream.__anext__())
+        try:
+            while True:
+                if pending:
+                    remaining = last_flush + STREAM_FLUSH_INTERVAL - time.monotonic()
+                    done, _ = await asyncio.wait({next_chunk}, timeout=max(remaining, 0))
+                    if not done:
+                        yield "".join(pending)
+                        pending.clear()
+                        pending_chars = 0
+                        last_flush = time.monotonic()
+                        continue
+                try:
+                    chunk = await next_chunk
+                except StopAsyncIteration:
+                    break
+                next_chunk = asyncio.ensure_future(stream.__anext__())
+                chunks.append(chunk)
+                pending.append(chunk)
+                pending_chars += len(chunk)
+                now = time.monotonic()
+                if pending_chars >= STREAM_FLUSH_CHARS or now - last_flush >= STREAM_FLUSH_INTERVAL:
+                    yield "".join(pending)
+                    pending.clear()
+                    pending_chars = 0
+                    last_flush = now
+            if pending:
+                yield "".join(pending)
+        finally:
+            # Stops the model stream too if the client went away mid-response
+            next_chunk.cancel()
+
+    async def _save_streamed_response(
         self,
-        message_id: int,
-        url: str,
-        model_name: str,
-        messages: List[MessageModel],
-        token_size: Optional[int] = None,
-        provider: str = "custom",
+        chat_id: int,
+        chunks: List[str],
         request_id: str = None
     ) -> None:
         """
-        Save the complete response for a streaming message.
+        Save the text streamed to the client as the assistant message.
+
+        Runs as the streaming response's background task, once the stream
+        has finished (or the client has gone away), so the reply is written
+        with a single insert.
 
         Args:
-            message_id: The ID of the message to update.
-            url: The API endpoint URL.
-            model_name: The name of the model to use.
-            messages: List of previous messages for context.
-            token_size: Maximum token size for the response.
-            provider: The provider name.
+            chat_id: The ID of the chat the reply belongs to.
+            chunks: The chunks forwarded to the client, in order.
             request_id: Optional request ID for logging.
         """
         if request_id is None:
-            request_id = str(uuid.uuid4())
+            request_id = request_id_var.get()
             
-        try:
-            full_response = ""
-            async for chunk in self.stream_model_response(
-                url=url,
-                model_name=model_name,
-                messages=messages,
-                token_size=token_size,
-                provider=provider,
-                stream=False  # Get the full response in one go
-            ):
-                full_response += chunk
-            
-            # Create a new session for the background task
-            # to avoid session conflicts
-            bg_db = SessionLocal()
+        full_response = "".join(chunks)
+        if not full_response.strip():
+            logger.warning(
+                "Not saving empty streamed response in chat %s",
+                chat_id,
+                extra={"request_id": request_id, "chat_id": chat_id}
+            )
+            return
+        
+        # The request's session is closed by now, so use a new one
+        async with AsyncSessionLocal() as bg_db:
             try:
-                # Update the message with the complete response
-                db_message = bg_db.query(MessageModel).filter(
-                    MessageModel.id == message_id
-                ).first()
+                result = await bg_db.execute(
+                    insert(MessageModel)
+                    .values(chat_id=chat_id, role="assistant", content=full_response)
+                    .returning(MessageModel.id)
+                )
+                message_id = result.scalar_one()
+                await bg_db.commit()
                 
-                if db_message and full_response.strip():
-                    db_message.content = full_response
-                    bg_db.commit()
-                    
-                    logger.info(
-                        f"Updated assistant message (ID: {message_id}) with complete response",
-                        extra={
-                            "request_id": request_id,
-                            "message_id": message_id,
-                            "content_length": len(full_response)
-                        }
-                    )
-                else:
-                    logger.warning(
-                        f"Could not update assistant message (ID: {message_id}) - "
-                        f"Message not found or empty response",
-                        extra={
-                            "request_id": request_id,
-                            "message_id": message_id,
-                            "found": db_message is not None,
-                            "response_length": len(full_response) if full_response else 0
-                        }
-                    )
+                logger.info(
+                    "Saved streamed assistant response (ID: %s) in chat %s",
+                    message_id,
+                    chat_id,
+                    extra={
+                        "request_id": request_id,
+                        "message_id": message_id,
+                        "content_length": len(full_response)
+                    }
+                )
             except Exception as e:
                 logger.error(
-                    f"Error saving complete response for message {message_id}: {str(e)}",
+                    "Error saving streamed response in chat %s: %s",
+                    chat_id,
+                    e,
                     extra={"request_id": request_id},
                     exc_info=True
                 )
-            finally:
-                bg_db.close()
-        except Exception as e:
-            logger.error(
-                f"Error in background task for message {message_id}: {str(e)}",
-                extra={"request_id": request_id},
-                exc_info=True
-            )
 
     async def stream_model_response(
         self,
@@ -294,13 +328,15 @@ class StreamingService:
 
     def create_streaming_response(
         self,
-        generator: AsyncGenerator[str, None]
+        generator: AsyncGenerator[str, None],
+        background: Optional[BackgroundTask] = None
     ) -> StreamingResponse:
         """
         Create a FastAPI StreamingResponse from an async generator.
         
         Args:
             generator: Async generator that yields response chunks
+            background: Optional task to run after the stream has been sent
             
         Returns:
             StreamingResponse object for FastAPI
@@ -313,6 +349,7 @@ class StreamingService:
         return StreamingResponse(
             stream_response(),
             media_type="text/event-stream",
+            background=background,
             headers={
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
@@ -1,79 +1,97 @@
 from typing import Dict, Any, Optional
 
 from sqlalchemy.exc import SQLAlchemyError
-from .models import  SessionLocal
+from .models import AsyncSessionLocal
 from .error_handlers import  DatabaseException
 import logging
 
 # Get logger
 logger = logging.getLogger("localchat")
 
-def get_db_dependency():
+async def get_db_dependency():
     """
     Create a database session dependency for FastAPI.
     Includes error handling for database operations.
     """
-    db = SessionLocal()
-    try:
-        yield db
-    except SQLAlchemyError as e:
-        logger.error(f"Database error: {str(e)}", exc_info=True)
-        raise DatabaseException(
-            detail="Database operation failed",
-            original_exception=e
-        )
-    finally:
-        db.close()
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except SQLAlchemyError as e:
+            logger.error("Database error: %s", e, exc_info=True)
+            raise DatabaseException(
+                detail="Database operation failed",
+                original_exception=e
+            )
 
 
-def extract_response_text(response_data: Dict[str, Any]) -> Optional[str]:
-    """
-    Extract the response text from various API response formats.
-
-    Args:
-        response_data: The JSON response data from the model API
-
-    Returns:
-        The extracted response text, or None if no text could be extracted
-    """
-    # OpenAI-like format
-    if "choices" in response_data and len(response_data["choices"]) > 0:
-        choice = response_data["choices"][0]
+def _text_from_choices(choices: Any) -> Optional[str]:
+    """OpenAI-like format"""
+    if choices:
+        choice = choices[0]
         if isinstance(choice, dict):
             if "message" in choice and "content" in choice["message"]:
                 return choice["message"]["content"]
             elif "text" in choice:
                 return choice["text"]
+    return None
 
-    # Ollama format
-    if "response" in response_data:
-        return response_data["response"]
-
-    # Hugging Face format
-    if "generated_text" in response_data:
-        return response_data["generated_text"]
-
-    # Anthropic format (older API)
-    if "completion" in response_data:
-        return response_data["completion"]
-
-    # Anthropic Claude API
-    if "content" in response_data and isinstance(response_data["content"], list):
-        for content_block in response_data["content"]:
+def _text_from_content_blocks(content: Any) -> Optional[str]:
+    """Anthropic Claude API"""
+    if isinstance(content, list):
+        for content_block in content:
             if isinstance(content_block, dict) and content_block.get("type") == "text":
                 return content_block.get("text", "")
+    return None
 
-    # Cohere format
-    if "generations" in response_data and len(response_data["generations"]) > 0:
-        generation = response_data["generations"][0]
+def _text_from_generations(generations: Any) -> Optional[str]:
+    """Cohere format"""
+    if generations:
+        generation = generations[0]
         if isinstance(generation, dict) and "text" in generation:
             return generation["text"]
+    return None
 
-    # AI21 format
-    if "completions" in response_data and len(response_data["completions"]) > 0:
-        completion = response_data["completions"][0]
+def _text_from_completions(completions: Any) -> Optional[str]:
+    """AI21 format"""
+    if completions:
+        completion = completions[0]
         if isinstance(completion, dict) and "data" in completion and "text" in completion["data"]:
             return completion["data"]["text"]
+    return None
+
+def _text_as_is(value: Any) -> Optional[str]:
+    """Formats that put the text directly under their key"""
+    return value
+
+# Top-level key that identifies each known response format, in the order they
+# are tried, with the function that pulls the text out of the key's value:
+# Ollama ("response"), Hugging Face ("generated_text") and the older
+# Anthropic API ("completion") hold the text directly.
+_RESPONSE_TEXT_EXTRACTORS = (
+    ("choices", _text_from_choices),
+    ("response", _text_as_is),
+    ("generated_text", _text_as_is),
+    ("completion", _text_as_is),
+    ("content", _text_from_content_blocks),
+    ("generations", _text_from_generations),
+    ("completions", _text_from_completions),
+)
+
+def extract_response_text(response_data: Dict[str, Any]) -> Optional[str]:
+    """
+    Extract the response text from various API response formats.
+
+    Args:
+        response_data: The JSON response data from the model API
+
+    Returns:
+        The extracted response text, or None if no text could be extracted
+    """
+    for key, extract in _RESPONSE_TEXT_EXTRACTORS:
+        if key in response_data:
+            text = extract(response_data[key])
+            if text is not None:
+                return text
 
     # If we can't determine the format, return the raw response as a string
     if isinstance(response_data, dict):
@@ -0,0 +1,49 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# The engine is created on import, so point it at a scratch database first
+DATABASE_PATH = Path(tempfile.mkdtemp(prefix="localchat-tests-")) / "localchat.db"
+os.environ["LOCALCHAT_DATABASE_URL"] = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from localchat.main import app  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    """Test client for the app, backed by a fresh SQLite database"""
+    # The engine is disposed on shutdown, so the files can go between tests
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{DATABASE_PATH}{suffix}").unlink(missing_ok=True)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def database_path(client):
+    """Path of the database file behind the test client"""
+    return DATABASE_PATH
+
+
+@pytest.fixture
+def profile_id(client):
+    response = client.post("/api/profiles/", json={
+        "name": "test-profile",
+        "provider": "ollama",
+        "url": "http://localhost:11434/api/generate",
+        "model_name": "test-model",
+        "token_size": 256
+    })
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+@pytest.fixture
+def chat_id(client, profile_id):
+    response = client.post("/api/chats/", json={"title": "Test chat", "profile_id": profile_id})
+    assert response.status_code == 201
+    return response.json()["id"]
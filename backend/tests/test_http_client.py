@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+from localchat.http_client import get_http_client, get_model_http_client
+from localchat.main import app
+from localchat.services.interactions.interaction_service import get_interaction_service
+from localchat.services.provider_service import get_provider_registry
+
+
+def test_shared_clients_are_rebuilt_after_shutdown():
+    with TestClient(app):
+        first_clients = (get_http_client(), get_model_http_client())
+    assert all(client.is_closed for client in first_clients)
+    
+    # A second startup in the same process gets working clients again
+    with TestClient(app):
+        http_client = get_http_client()
+        model_http_client = get_model_http_client()
+        assert not http_client.is_closed
+        assert not model_http_client.is_closed
+        assert get_provider_registry()["ollama"].http_client is http_client
+        assert get_interaction_service().streaming_strategy.http_client is model_http_client
@@ -1,7 +1,10 @@
 import asyncio
+import httpx
 import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
 
+from localchat.error_handlers import ModelBusyException
+from localchat.services.interactions import interaction_service as interaction_module
 from localchat.services.interactions.interaction_service import ModelInteractionService
 from localchat.services.interactions.streaming_strategy import StreamingInteractionStrategy
 from localchat.services.interactions.non_streaming_strategy import NonStreamingInteractionStrategy
@@ -103,9 +106,9 @@ async def test_integration(mock_get_adapter, mock_adapter):
     
     # Test non-streaming execution
     with patch("httpx.AsyncClient.post") as mock_post:
-        mock_response = AsyncMock()
-        mock_response.raise_for_status = AsyncMock()
-        mock_response.json.return_value = {"response": "Test API response"}
+        # The strategy parses the raw body bytes rather than calling .json()
+        mock_response = MagicMock(spec=httpx.Response)
+        mock_response.content = b'{"response": "Test API response"}'
         mock_post.return_value = mock_response
         
         response = await service.execute_non_streaming(
@@ -118,7 +121,109 @@ async def test_integration(mock_get_adapter, mock_adapter):
         assert response == "Test response"
         mock_adapter.format_url.assert_called_once()
         mock_adapter.format_request_payload.assert_called_once()
-        mock_adapter.extract_response_text.assert_called_once()
+        mock_adapter.extract_response_text.assert_called_once_with({"response": "Test API response"})
+
+
+@pytest.fixture
+def single_slot_service(monkeypatch, mock_streaming_strategy):
+    """Service with one generation slot whose non-streaming calls block until released"""
+    monkeypatch.setattr(interaction_module, "MAX_CONCURRENT_GENERATIONS", 1)
+    release = asyncio.Event()
+    active = []
+    max_active = []
+    
+    async def blocking_execute(**kwargs):
+        active.append(1)
+        max_active.append(len(active))
+        await release.wait()
+        active.pop()
+        return "Complete response"
+    
+    strategy = AsyncMock(spec=NonStreamingInteractionStrategy)
+    strategy.execute = blocking_execute
+    service = ModelInteractionService(
+        streaming_strategy=mock_streaming_strategy,
+        non_streaming_strategy=strategy
+    )
+    return service, release, max_active
+
+
+def _generate(service):
+    return service.execute_non_streaming(
+        url="http://test-url.com",
+        model_name="test-model",
+        messages=[MessageModel(id=1, chat_id=1, role="user", content="Hello")],
+        provider="test-provider"
+    )
+
+
+@pytest.mark.asyncio
+async def test_generation_waits_for_a_free_slot(single_slot_service):
+    service, release, max_active = single_slot_service
+    
+    first = asyncio.create_task(_generate(service))
+    second = asyncio.create_task(_generate(service))
+    await asyncio.sleep(0.05)
+    
+    # The second request is queued behind the first, not running alongside it
+    assert not second.done()
+    assert max_active == [1]
+    
+    release.set()
+    assert await first == "Complete response"
+    assert await second == "Complete response"
+    assert max_active == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_generation_times_out_when_no_slot_frees_up(monkeypatch, single_slot_service):
+    monkeypatch.setattr(interaction_module, "GENERATION_QUEUE_TIMEOUT", 0.05)
+    service, release, _ = single_slot_service
+    
+    first = asyncio.create_task(_generate(service))
+    await asyncio.sleep(0)
+    with pytest.raises(ModelBusyException) as exc_info:
+        await _generate(service)
+    assert exc_info.value.status_code == 503
+    
+    # The timed-out request must not have taken the slot with it
+    release.set()
+    assert await first == "Complete response"
+    assert await _generate(service) == "Complete response"
+
+
+@pytest.mark.asyncio
+async def test_slot_granted_as_the_wait_times_out_is_released(monkeypatch, single_slot_service):
+    service, _, _ = single_slot_service
+    
+    async def acquire_then_time_out(awaitable, timeout):
+        # The acquire completes, but the timeout is reported anyway
+        await awaitable
+        raise asyncio.TimeoutError()
+    
+    monkeypatch.setattr(interaction_module.asyncio, "wait_for", acquire_then_time_out)
+    with pytest.raises(ModelBusyException):
+        await _generate(service)
+    monkeypatch.undo()
+    
+    assert not service._generation_slots.locked()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_wait_does_not_take_a_slot_later(single_slot_service):
+    service, release, _ = single_slot_service
+    
+    first = asyncio.create_task(_generate(service))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(_generate(service))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    
+    release.set()
+    assert await first == "Complete response"
+    assert not service._generation_slots.locked()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from localchat.middleware import SelectiveGZipMiddleware
+
+
+@pytest.fixture
+def gzip_client():
+    app = FastAPI()
+    app.add_middleware(SelectiveGZipMiddleware, minimum_size=1000)
+    
+    @app.get("/large")
+    async def large():
+        return {"content": "x" * 2000}
+    
+    @app.get("/small")
+    async def small():
+        return {"content": "x"}
+    
+    @app.get("/events")
+    async def events():
+        async def generate():
+            for i in range(3):
+                yield f"data: {'x' * 1000}{i}\n\n"
+        return StreamingResponse(generate(), media_type="text/event-stream")
+    
+    @app.get("/lines")
+    async def lines():
+        async def generate():
+            for i in range(3):
+                yield f'{{"content": "{"x" * 1000}{i}"}}\n'
+        return StreamingResponse(generate(), media_type="application/x-ndjson")
+    
+    return TestClient(app, headers={"Accept-Encoding": "gzip"})
+
+
+def test_large_json_is_compressed(gzip_client):
+    response = gzip_client.get("/large")
+    
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == {"content": "x" * 2000}
+
+
+def test_small_json_is_not_compressed(gzip_client):
+    response = gzip_client.get("/small")
+    
+    assert "content-encoding" not in response.headers
+
+
+def test_event_stream_bypasses_compression(gzip_client):
+    with gzip_client.stream("GET", "/events") as response:
+        raw = b"".join(response.iter_raw())
+    
+    assert "content-encoding" not in response.headers
+    assert raw == b"".join(f"data: {'x' * 1000}{i}\n\n".encode() for i in range(3))
+
+
+def test_ndjson_stream_bypasses_compression(gzip_client):
+    with gzip_client.stream("GET", "/lines") as response:
+        raw = b"".join(response.iter_raw())
+    
+    assert "content-encoding" not in response.headers
+    assert raw == b"".join(f'{{"content": "{"x" * 1000}{i}"}}\n'.encode() for i in range(3))
@@ -0,0 +1,17 @@
+from sqlalchemy.engine import make_url
+
+from localchat.models import _engine_options
+
+
+def test_sqlite_engine_gets_sqlite_connect_args_and_no_pre_ping():
+    options = _engine_options(make_url("sqlite+aiosqlite:///./localchat.db"))
+    
+    assert options["connect_args"] == {"check_same_thread": False, "cached_statements": 256}
+    assert "pool_pre_ping" not in options
+
+
+def test_server_engine_gets_no_sqlite_options():
+    options = _engine_options(make_url("postgresql+asyncpg://user@localhost/localchat"))
+    
+    assert "connect_args" not in options
+    assert options["pool_pre_ping"] is True
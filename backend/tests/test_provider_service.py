@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from localchat.main import app
+from localchat.services import provider_service as provider_module
+from localchat.services.provider_service import ModelListClient, get_provider_registry
+
+
+@pytest.fixture
+def model_server():
+    """Fake model listing endpoint that records the URLs it was asked for"""
+    requested = []
+    
+    def handler(request):
+        requested.append(str(request.url))
+        return httpx.Response(200, json={"models": [{"name": f"model-{len(requested)}"}]})
+    
+    return SimpleNamespace(requested=requested, transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manually advanced stand-in for the cache's monotonic clock"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(provider_module, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+@pytest_asyncio.fixture
+async def list_client(model_server):
+    async with httpx.AsyncClient(transport=model_server.transport) as http_client:
+        yield ModelListClient(
+            "ollama",
+            "/api/tags",
+            http_client,
+            default_base_url="http://localhost:11434",
+            strip_suffixes=("/api/generate",)
+        )
+
+
+@pytest.mark.asyncio
+async def test_model_list_is_cached_until_ttl_expires(list_client, model_server, clock):
+    first = await list_client.list_models("http://ollama.test")
+    clock.value += provider_module.MODEL_LIST_CACHE_TTL - 1
+    cached = await list_client.list_models("http://ollama.test")
+    clock.value += 1
+    refreshed = await list_client.list_models("http://ollama.test")
+    
+    assert cached == first
+    assert refreshed == [{"name": "model-2"}]
+    assert len(model_server.requested) == 2
+
+
+@pytest.mark.asyncio
+async def test_use_cache_false_fetches_and_stores_a_fresh_list(list_client, model_server, clock):
+    await list_client.list_models("http://ollama.test")
+    fresh = await list_client.list_models("http://ollama.test", use_cache=False)
+    cached = await list_client.list_models("http://ollama.test")
+    
+    assert fresh == cached == [{"name": "model-2"}]
+    assert len(model_server.requested) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_oldest_url_first(list_client, model_server, clock):
+    urls = [f"http://ollama-{i}.test" for i in range(provider_module.MODEL_LIST_CACHE_MAX_ENTRIES + 1)]
+    for url in urls:
+        await list_client.list_models(url)
+    
+    # The second URL is still cached; the first was evicted by the last
+    await list_client.list_models(urls[1])
+    assert len(model_server.requested) == len(urls)
+    await list_client.list_models(urls[0])
+    assert len(model_server.requested) == len(urls) + 1
+    assert len(list_client._cache) == provider_module.MODEL_LIST_CACHE_MAX_ENTRIES
+
+
+@pytest.mark.asyncio
+async def test_equivalent_base_urls_share_one_cache_entry(list_client, model_server, clock):
+    for base_url in (
+        "http://ollama.test:11434",
+        "http://ollama.test:11434/",
+        "http://ollama.test:11434/api/generate",
+        "http://ollama.test:11434/api/generate/"
+    ):
+        await list_client.list_models(base_url)
+    
+    assert model_server.requested == ["http://ollama.test:11434/api/tags"]
+
+
+@pytest.fixture
+def registry_client(client, model_server):
+    """App client whose model listings come from the fake model server"""
+    http_client = httpx.AsyncClient(transport=model_server.transport)
+    registry = {"ollama": ModelListClient("ollama", "/api/tags", http_client)}
+    app.dependency_overrides[get_provider_registry] = lambda: registry
+    yield client
+    app.dependency_overrides.pop(get_provider_registry)
+
+
+def test_no_cache_query_parameter_bypasses_the_cache(registry_client, model_server, clock):
+    params = {"base_url": "http://ollama.test"}
+    
+    first = registry_client.get("/api/models/ollama", params=params).json()
+    cached = registry_client.get("/api/models/ollama", params=params).json()
+    fresh = registry_client.get("/api/models/ollama", params={**params, "no_cache": True}).json()
+    
+    assert cached == first == [{"name": "model-1"}]
+    assert fresh == [{"name": "model-2"}]
+    assert len(model_server.requested) == 2
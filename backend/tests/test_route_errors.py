@@ -0,0 +1,105 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from localchat.error_handlers import register_exception_handlers
+from localchat.exceptions import (
+    ChatCreationError,
+    ChatDeletionError,
+    ChatNotFoundError,
+    DatabaseOperationError,
+    MessageCreationError,
+    MessageFetchError,
+    ModelInteractionError,
+    ModelNotFoundError,
+    ProfileNotFoundError
+)
+from localchat.routes import route_errors
+
+
+def _database_error(message):
+    return {"error": True, "code": "DATABASE_ERROR", "message": message, "details": {"source": "database"}}
+
+
+ERROR_CASES = [
+    # Database failures share the database error body
+    (DatabaseOperationError("Database down"), 500, _database_error("Database down")),
+    (MessageCreationError("Could not save message"), 500, _database_error("Could not save message")),
+    (MessageFetchError("Could not read messages"), 500, _database_error("Could not read messages")),
+    (
+        MessageFetchError("Could not read messages", original_exception=ValueError("bad row")),
+        500,
+        {**_database_error("Could not read messages"), "details": {"source": "database", "exception_type": "ValueError"}}
+    ),
+    # Other service errors map to their own status codes
+    (ChatNotFoundError(), 404, {"detail": "Chat not found"}),
+    (ProfileNotFoundError(), 404, {"detail": "Profile not found"}),
+    (ModelNotFoundError(), 404, {"detail": "Model not found at provider"}),
+    (ChatCreationError("Profile does not exist", is_client_error=True), 400, {"detail": "Profile does not exist"}),
+    (ModelInteractionError("Model API unreachable"), 502, {"detail": "Model API unreachable"}),
+    (ChatDeletionError("Could not delete chat"), 500, {"detail": "Could not delete chat"}),
+]
+
+
+@pytest.fixture
+def raising_client():
+    """Client for an app whose only route raises the exception it is given"""
+    app = FastAPI()
+    register_exception_handlers(app)
+    
+    @app.get("/raise")
+    @route_errors
+    async def raise_error():
+        raise app.state.error
+    
+    def client_for(error, raise_server_exceptions=False):
+        app.state.error = error
+        return TestClient(app, raise_server_exceptions=raise_server_exceptions)
+    
+    return client_for
+
+
+@pytest.mark.parametrize(
+    "error, status_code, body",
+    ERROR_CASES,
+    ids=[type(error).__name__ for error, _, _ in ERROR_CASES]
+)
+def test_route_errors_maps_service_exceptions(raising_client, error, status_code, body):
+    response = raising_client(error).get("/raise")
+    
+    assert response.status_code == status_code
+    assert response.json() == body
+
+
+def test_route_errors_leaves_other_exceptions_to_the_generic_handler(raising_client):
+    response = raising_client(RuntimeError("unexpected")).get("/raise")
+    
+    assert response.status_code == 500
+    assert response.json()["code"] == "INTERNAL_SERVER_ERROR"
+
+
+def test_database_errors_are_logged_once_with_traceback(raising_client, caplog):
+    handler_logger = logging.getLogger("localchat")
+    handler_logger.addHandler(caplog.handler)
+    try:
+        raising_client(DatabaseOperationError("Database down")).get("/raise")
+    finally:
+        handler_logger.removeHandler(caplog.handler)
+    
+    errors = [record for record in caplog.records if record.levelno >= logging.ERROR]
+    assert len(errors) == 1
+    assert errors[0].exc_info is not None
+
+
+def test_unexpected_exception_keeps_its_traceback(raising_client):
+    client = raising_client(RuntimeError("unexpected"), raise_server_exceptions=True)
+    
+    # The server error middleware re-raises the handled exception
+    with pytest.raises(RuntimeError) as exc_info:
+        client.get("/raise")
+    
+    # Still pointing at the endpoint that raised it
+    frames = [entry.name for entry in exc_info.traceback]
+    assert "raise_error" in frames
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import sqlite3
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from localchat.error_handlers import ModelAPIException, ModelBusyException
+from localchat.services.interactions import interaction_service as interaction_module
+from localchat.services.interactions.interaction_service import get_interaction_service
+
+
+@pytest.fixture
+def no_free_generation_slots(monkeypatch):
+    monkeypatch.setattr(interaction_module, "GENERATION_QUEUE_TIMEOUT", 0.01)
+    monkeypatch.setattr(get_interaction_service(), "_generation_slots", asyncio.Semaphore(0))
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_create_message_returns_503_when_model_is_busy(client, chat_id, no_free_generation_slots, stream):
+    response = client.post(
+        f"/api/chats/{chat_id}/messages/",
+        params={"stream": stream},
+        json={"role": "user", "content": "Hello"}
+    )
+
+    # Reported before any stream starts, with its own error code
+    assert response.status_code == 503
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["code"] == "MODEL_BUSY"
+
+
+@pytest.mark.parametrize("error", [
+    ModelAPIException(detail="Model API unreachable"),
+    ModelBusyException()
+], ids=["model_error", "model_busy"])
+def test_user_message_is_kept_when_the_model_fails(client, chat_id, error):
+    with patch(
+        "localchat.services.model_service.ModelService.get_model_response",
+        AsyncMock(side_effect=error)
+    ):
+        response = client.post(
+            f"/api/chats/{chat_id}/messages/",
+            params={"stream": False},
+            json={"role": "user", "content": "Hello"}
+        )
+    
+    assert response.status_code == error.status_code
+    messages = client.get(f"/api/chats/{chat_id}/messages/").json()
+    assert [(message["role"], message["content"]) for message in messages] == [("user", "Hello")]
+
+
+@pytest.fixture
+def chat_ids(client, profile_id):
+    """IDs of five chats, in creation order"""
+    ids = []
+    for i in range(5):
+        response = client.post("/api/chats/", json={"title": f"Chat {i}", "profile_id": profile_id})
+        assert response.status_code == 201
+        ids.append(response.json()["id"])
+    return ids
+
+
+def test_read_chats_pages_by_after_id_with_limit(client, chat_ids):
+    first_page = client.get("/api/chats/", params={"limit": 2}).json()
+    second_page = client.get("/api/chats/", params={"after_id": first_page[-1]["id"], "limit": 2}).json()
+    last_page = client.get("/api/chats/", params={"after_id": second_page[-1]["id"], "limit": 2}).json()
+    
+    assert [chat["id"] for chat in first_page] == chat_ids[:2]
+    assert [chat["id"] for chat in second_page] == chat_ids[2:4]
+    assert [chat["id"] for chat in last_page] == chat_ids[4:]
+
+
+def test_read_chats_ignores_skip_with_after_id(client, chat_ids):
+    response = client.get("/api/chats/", params={"after_id": chat_ids[0], "skip": 2, "limit": 2})
+    
+    assert [chat["id"] for chat in response.json()] == chat_ids[1:3]
+
+
+def test_read_chats_after_last_id_is_empty(client, chat_ids):
+    response = client.get("/api/chats/", params={"after_id": chat_ids[-1]})
+    
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+@pytest.fixture
+def chat_with_messages(client, chat_id):
+    """A chat holding two exchanges with a stubbed model"""
+    with patch(
+        "localchat.services.model_service.ModelService.get_model_response",
+        AsyncMock(side_effect=["First reply", "Second reply"])
+    ):
+        for content in ("First question", "Second question"):
+            response = client.post(
+                f"/api/chats/{chat_id}/messages/",
+                params={"stream": False},
+                json={"role": "user", "content": content}
+            )
+            assert response.status_code == 200
+    return chat_id
+
+
+def test_read_messages_as_ndjson_streams_one_message_per_line(client, chat_with_messages):
+    url = f"/api/chats/{chat_with_messages}/messages/"
+    
+    response = client.get(url, params={"format": "ndjson"})
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.text.endswith("\n")
+    messages = [json.loads(line) for line in response.text.splitlines()]
+    assert [message["content"] for message in messages] == [
+        "First question", "First reply", "Second question", "Second reply"
+    ]
+    assert messages == client.get(url).json()
+
+
+def test_messages_of_one_exchange_have_distinct_timestamps(client, chat_with_messages):
+    messages = client.get(f"/api/chats/{chat_with_messages}/messages/").json()
+    
+    timestamps = [message["created_at"] for message in messages]
+    assert timestamps == sorted(set(timestamps))
+
+
+def test_read_messages_as_ndjson_pages_with_skip_and_limit(client, chat_with_messages):
+    response = client.get(
+        f"/api/chats/{chat_with_messages}/messages/",
+        params={"format": "ndjson", "skip": 1, "limit": 2}
+    )
+    
+    lines = response.text.splitlines()
+    assert [json.loads(line)["content"] for line in lines] == ["First reply", "Second question"]
+
+
+def test_read_messages_as_ndjson_for_missing_chat_is_404(client):
+    response = client.get("/api/chats/999/messages/", params={"format": "ndjson"})
+    
+    assert response.status_code == 404
+    assert response.headers["content-type"] == "application/json"
+
+
+def test_delete_chat(client, chat_id):
+    response = client.delete(f"/api/chats/{chat_id}")
+    
+    assert response.status_code == 200
+    assert client.get(f"/api/chats/{chat_id}").status_code == 404
+
+
+def test_delete_chat_without_title(client, chat_id, database_path):
+    # Rows from older databases may have no title
+    with sqlite3.connect(database_path) as connection:
+        connection.execute("UPDATE chats SET title = NULL WHERE id = ?", (chat_id,))
+    
+    response = client.delete(f"/api/chats/{chat_id}")
+    
+    assert response.status_code == 200
+
+
+def test_delete_missing_chat_is_404(client):
+    assert client.delete("/api/chats/999").status_code == 404
@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+import pytest
+
+from localchat.services import streaming_service as streaming_module
+from localchat.services.streaming_service import StreamingService
+
+
+async def _model_stream(steps):
+    """Yield text chunks, sleeping wherever a step is a delay in seconds"""
+    for step in steps:
+        if isinstance(step, str):
+            yield step
+        else:
+            await asyncio.sleep(step)
+
+
+async def _timed_events(steps):
+    chunks = []
+    start = time.monotonic()
+    events = [
+        (text, time.monotonic() - start)
+        async for text in StreamingService._coalesce_chunks(_model_stream(steps), chunks)
+    ]
+    return events, chunks
+
+
+@pytest.mark.asyncio
+async def test_buffered_text_is_flushed_while_the_model_stalls(monkeypatch):
+    monkeypatch.setattr(streaming_module, "STREAM_FLUSH_INTERVAL", 0.05)
+    
+    events, chunks = await _timed_events(["He", "l", "lo", 0.5, "!"])
+    
+    assert [text for text, _ in events] == ["He", "llo", "!"]
+    # "llo" goes out when the interval is up, not when "!" arrives
+    assert events[1][1] < 0.25
+    assert chunks == ["He", "l", "lo", "!"]
+
+
+@pytest.mark.asyncio
+async def test_large_buffers_are_flushed_without_waiting(monkeypatch):
+    monkeypatch.setattr(streaming_module, "STREAM_FLUSH_CHARS", 4)
+    monkeypatch.setattr(streaming_module, "STREAM_FLUSH_INTERVAL", 10)
+    
+    events, _ = await _timed_events(["a", "bc", "de", "f"])
+    
+    assert [text for text, _ in events] == ["a", "bcde", "f"]
+
+
+@pytest.mark.asyncio
+async def test_closing_the_response_stops_the_model_stream():
+    stopped = asyncio.Event()
+    
+    async def endless_stream():
+        try:
+            while True:
+                yield "x"
+                await asyncio.sleep(0.01)
+        finally:
+            stopped.set()
+    
+    events = StreamingService._coalesce_chunks(endless_stream(), [])
+    await events.__anext__()
+    await events.aclose()
+    
+    await asyncio.wait_for(stopped.wait(), 1)
@@ -0,0 +1,99 @@
+import httpx
+import pytest
+
+from localchat.models import MessageModel
+from localchat.services.adapters.ollama_adapter import OllamaAdapter
+from localchat.services.adapters.openai_adapter import OpenAIAdapter
+from localchat.services.interactions.streaming_strategy import (
+    StreamingInteractionStrategy,
+    iter_byte_lines
+)
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+async def _lines(byte_chunks):
+    return [line async for line in iter_byte_lines(_aiter(byte_chunks))]
+
+
+@pytest.mark.asyncio
+async def test_iter_byte_lines_joins_lines_split_across_chunks():
+    assert await _lines([b"fir", b"st\nsec", b"ond\n"]) == [b"first", b"second"]
+
+
+@pytest.mark.asyncio
+async def test_iter_byte_lines_yields_trailing_line_without_newline():
+    assert await _lines([b"first\nlast"]) == [b"first", b"last"]
+
+
+@pytest.mark.asyncio
+async def test_iter_byte_lines_handles_several_lines_per_chunk_and_empty_chunks():
+    assert await _lines([b"a\nb\n", b"", b"\nc\n"]) == [b"a", b"b", b"", b"c"]
+
+
+@pytest.mark.asyncio
+async def test_iter_byte_lines_keeps_carriage_returns():
+    # The line splitter only cuts on LF; the strategy strips the CR later
+    assert await _lines([b"first\r", b"\nsecond\r\n"]) == [b"first\r", b"second\r"]
+
+
+async def _stream(adapter, body_chunks):
+    """Run the streaming strategy against a model API that sends body_chunks"""
+    def handler(request):
+        return httpx.Response(200, content=_aiter(body_chunks))
+    
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        strategy = StreamingInteractionStrategy(http_client=client)
+        return [chunk async for chunk in strategy.execute(
+            adapter=adapter,
+            url="http://model.test",
+            model_name="test-model",
+            messages=[MessageModel(id=1, chat_id=1, role="user", content="Hello")],
+            token_size=256
+        )]
+
+
+def _openai_event(text):
+    return b'data: {"choices": [{"delta": {"content": "%s"}, "finish_reason": null}]}' % text.encode()
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_skips_non_data_lines_and_stops_at_done():
+    body = b"\r\n".join([
+        b": keep-alive",
+        b"event: completion",
+        b"id: 1",
+        b"retry: 1000",
+        _openai_event("Hel"),
+        b"",
+        _openai_event("lo"),
+        b"data: [DONE]",
+        _openai_event("ignored"),
+        b""
+    ])
+    
+    # Split mid-event so that events also cross chunk boundaries
+    chunks = await _stream(OpenAIAdapter(), [body[:40], body[40:95], body[95:]])
+    
+    assert chunks == ["Hel", "lo"]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_stream_stops_at_final_chunk():
+    chunks = await _stream(OllamaAdapter(), [
+        b'{"response": "Hel", "done": false}\n{"resp',
+        b'onse": "lo", "done": false}\nnot json\n',
+        b'{"response": "", "done": true}\n{"response": "ignored", "done": false}'
+    ])
+    
+    assert chunks == ["Hel", "lo"]
+
+
+@pytest.mark.asyncio
+async def test_stream_parses_trailing_event_without_newline():
+    chunks = await _stream(OpenAIAdapter(), [_openai_event("Hi") + b"\n", _openai_event("!")])
+    
+    assert chunks == ["Hi", "!"]
@@ -15,7 +15,7 @@ start_backend() {
   fi
   
   echo "Starting FastAPI server..."
-  uvicorn localchat.main:app --reload --host 0.0.0.0 --port 8000 &
+  LOCALCHAT_RELOAD=1 python -m localchat.main &
   BACKEND_PID=$!
   cd ..
   echo "Backend server running with PID: $BACKEND_PID"